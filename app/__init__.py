@@ -20,15 +20,26 @@ def create_app():
     from app.models.attributes import Attribute
     from app.models.sources import Source
     from app.models.results import Result
+    from app.models.jobs import CrawlJob
+    from app.models.tasks import CrawlTask
+    from app.models.extraction_cache import ExtractionCache
     
     # Register blueprints
     from app.api.attributes import attributes_bp
     from app.api.sources import sources_bp
     from app.api.crawl import crawler_bp
+    from app.api.results import results_bp
+    from app.api.metrics import metrics_bp
     # from app.api.web import web_bp
     app.register_blueprint(attributes_bp, url_prefix="/api")
     app.register_blueprint(sources_bp, url_prefix="/api")
     app.register_blueprint(crawler_bp, url_prefix="/api")
+    app.register_blueprint(results_bp, url_prefix="/api")
+    # Served at /metrics, where Prometheus scrapes by default
+    app.register_blueprint(metrics_bp)
     # app.register_blueprint(web_bp)
 
+    from app.cli import register_cli
+    register_cli(app)
+
     return app
\ No newline at end of file
@@ -6,9 +6,13 @@ from app.schemas.attributes import AttributeCreate, AttributeUpdate, AttributeOu
 from app import db
 from pydantic import ValidationError
 from uuid import UUID
+from app.api.listing import ListingError, conditional_json, paginate, project, requested_fields
+from app.services.crawler import invalidate_dynamic_models
 
 attributes_bp = Blueprint("attributes", __name__)
 
+ATTRIBUTE_FIELDS = ["id", "name", "type", "description", "source_id"]
+
 @attributes_bp.route("/attributes", methods=["POST"])
 @swag_from({
     "tags": ["Attributes"],
@@ -50,6 +54,7 @@ def create_attribute():
     attribute = Attribute(**data.dict())
     db.session.add(attribute)
     db.session.commit()
+    invalidate_dynamic_models(str(attribute.source_id))
     return jsonify(AttributeOut.from_orm(attribute).dict()), 201
 
 @attributes_bp.route("/attributes/<attribute_id>", methods=["GET"])
@@ -86,17 +91,37 @@ def get_attribute(attribute_id):
 @attributes_bp.route("/attributes", methods=["GET"])
 @swag_from({
     "tags": ["Attributes"],
+    "parameters": [
+        {"name": "limit", "in": "query", "type": "integer", "default": 100, "description": "Page size, max 1000"},
+        {"name": "cursor", "in": "query", "type": "string", "description": "X-Next-Cursor header of the previous page"},
+        {"name": "fields", "in": "query", "type": "string", "description": "Comma separated fields to return, e.g. id,url"},
+        {"name": "source_id", "in": "query", "type": "string", "description": "Only attributes of this source"},
+        {"name": "If-None-Match", "in": "header", "type": "string", "description": "ETag of a previous response"}
+    ],
     "responses": {
         200: {
-            "description": "List of attributes",
+            "description": "Page of attributes ordered by id; X-Next-Cursor is set when more remain",
             "schema": {"type": "array", "items": AttributeOut.schema()}
-        }
+        },
+        304: {"description": "Not modified since the ETag in If-None-Match"},
+        400: {"description": "Invalid source_id, cursor or fields"}
     }
 })
 def list_attributes():
-    """List all attributes"""
-    attributes = Attribute.query.all()
-    return jsonify([AttributeOut.from_orm(attr).dict() for attr in attributes]), 200
+    """List attributes, optionally of one source"""
+    try:
+        fields = requested_fields(ATTRIBUTE_FIELDS)
+        query = Attribute.query
+        if request.args.get("source_id"):
+            try:
+                query = query.filter_by(source_id=UUID(request.args["source_id"]))
+            except ValueError:
+                raise ListingError("Invalid source_id")
+        attributes, next_cursor = paginate(query, Attribute, fields)
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
+    # Serialize columns directly; AttributeOut.from_orm per row is the slow path
+    return conditional_json([project(attr, fields) for attr in attributes], next_cursor)
 
 @attributes_bp.route("/attributes/<attribute_id>", methods=["PUT"])
 @swag_from({
@@ -149,10 +174,12 @@ def update_attribute(attribute_id):
     if data.source_id and not Source.query.filter_by(id=data.source_id).first():
         return jsonify({"error": "Source not found"}), 404
 
+    old_source_id = str(attribute.source_id)
     for key, value in data.dict(exclude_unset=True).items():
         setattr(attribute, key, value)
 
     db.session.commit()
+    invalidate_dynamic_models(old_source_id, str(attribute.source_id))
     return jsonify(AttributeOut.from_orm(attribute).dict()), 200
 
 @attributes_bp.route("/attributes/<attribute_id>", methods=["DELETE"])
@@ -184,6 +211,8 @@ def delete_attribute(attribute_id):
     if not attribute:
         return jsonify({"error": "Attribute not found"}), 404
 
+    source_id = str(attribute.source_id)
     db.session.delete(attribute)
     db.session.commit()
+    invalidate_dynamic_models(source_id)
     return "", 204
\ No newline at end of file
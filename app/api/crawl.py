@@ -1,35 +1,130 @@
 # # crawl.py
 from flask import jsonify, request, Blueprint, current_app
-from app.services.crawler_runner import run_crawler
+from uuid import UUID
+from app.config import Config
+from app.models.jobs import CrawlJob
+from app.schemas.jobs import JobOut
+from app.services.jobs import start_job, start_distributed_job, stop_job, stop_running_jobs
+from app.services import work_queue
 from app.services.crawler import stopCrawl
+from app.services.driver_pool import driver_pool
+from app.services.extraction_cache import extraction_cache
+from app.services.llm_client import key_pool
+from app.services.result_writer import result_writer
+from app.services.politeness import scheduler
+from app.services.readiness import readiness
+from app.services.reduce_pool import reduce_pool
+from app.services.crawl_engine import pipeline_stats
 
 # Create a Blueprint for crawler API endpoints
 crawler_bp = Blueprint('crawler', __name__)
 
+_TRUE = ('true', '1', 'yes')
+_FALSE = ('false', '0', 'no')
+
+
+def _flag(data: dict, key: str, default: bool) -> bool:
+    """Boolean body field; JSON booleans or "true"/"false"-style strings, anything else is rejected"""
+    value = data.get(key, default)
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in _TRUE + _FALSE:
+        return value.strip().lower() in _TRUE
+    raise ValueError(f"Invalid {key}: expected true or false")
+
 @crawler_bp.route('/start', methods=['POST'])
 def start_crawler():
-    """Start the web crawler for all sources or a specific source"""
+    """Queue a crawl job for all sources or a specific source and return its id"""
     try:
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         web_id = data.get('web_id')
         print(f"Print web_id: {web_id}")
+        if web_id:
+            try:
+                UUID(web_id)
+            except ValueError:
+                return jsonify({"status": "error", "message": "Invalid web_id"}), 400
         
-        # Truyền current_app vào run_crawler
-        success = run_crawler(web_id, current_app._get_current_object())
-        
-        if success:
-            return jsonify({"status": "success", "message": "Crawler started successfully"}), 200
+        try:
+            incremental = _flag(data, 'incremental', Config.CRAWL_INCREMENTAL)
+            distributed = _flag(data, 'distributed', Config.CRAWL_DISTRIBUTED)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+
+        # Crawl chạy nền, request trả về ngay với job_id
+        # distributed: chỉ xếp listing vào crawl_tasks, các worker.py sẽ xử lý
+        if distributed:
+            job = start_distributed_job(web_id, current_app._get_current_object(), incremental)
         else:
-            return jsonify({"status": "error", "message": "Failed to start crawler"}), 500
+            job = start_job(web_id, current_app._get_current_object(), incremental)
+        
+        return jsonify({
+            "status": "accepted",
+            "message": "Crawler job started",
+            "job_id": str(job.id)
+        }), 202
             
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@crawler_bp.route('/jobs', methods=['GET'])
+def list_jobs():
+    """List crawl jobs, newest first"""
+    limit = max(1, min(request.args.get('limit', 50, type=int), 500))
+    query = CrawlJob.query
+    if request.args.get('state'):
+        query = query.filter_by(state=request.args['state'].upper())
+    jobs = query.order_by(CrawlJob.created_at.desc()).limit(limit).all()
+    return jsonify([JobOut.from_orm(job).dict() for job in jobs]), 200
+
+@crawler_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the state, counters and per-source progress of a crawl job"""
+    try:
+        UUID(job_id)
+    except ValueError:
+        return jsonify({"error": "Invalid job_id"}), 400
+
+    job = CrawlJob.query.filter_by(id=job_id).first()
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify(JobOut.from_orm(job).dict()), 200
+
+@crawler_bp.route('/stats', methods=['GET'])
+def crawler_stats():
+    """Runtime counters of the shared crawler services in this process"""
+    return jsonify({
+        "driver_pool": driver_pool.stats(),
+        "extraction_cache": extraction_cache.stats(),
+        "llm_keys": key_pool.stats(),
+        "result_writer": result_writer.stats(),
+        "politeness": scheduler.stats(),
+        "readiness": readiness.stats(),
+        "reduce_pool": reduce_pool.stats(),
+        "pipeline": pipeline_stats()
+    }), 200
+
 @crawler_bp.route('/stop', methods=['POST'])
 def stop_crawler():
-    """Stop all running crawler threads"""
+    """Stop one job given as job_id, or every running crawl"""
     try:
+        data = request.get_json(silent=True) or {}
+        if data.get('job_id'):
+            # Chỉ dừng job này; driver pool và các job khác vẫn chạy
+            job_id = data['job_id']
+            try:
+                UUID(job_id)
+            except ValueError:
+                return jsonify({"status": "error", "message": "Invalid job_id"}), 400
+            if stop_job(job_id) or work_queue.stop_jobs(job_id):
+                return jsonify({"status": "success", "message": f"Stop signal sent to job {job_id}"}), 200
+            return jsonify({"status": "error", "message": "Job is not running"}), 404
+        stop_running_jobs()
         stopCrawl()
+        work_queue.stop_jobs()
         return jsonify({"status": "success", "message": "Stop signal sent to crawler threads"}), 200
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
\ No newline at end of file
+        return jsonify({"status": "error", "message": str(e)}), 500
@@ -0,0 +1,56 @@
+from flask import request, jsonify
+from sqlalchemy.orm import load_only
+from uuid import UUID
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class ListingError(ValueError):
+    pass
+
+
+def requested_fields(allowed):
+    """Fields asked for with ?fields=a,b (all fields when absent); id is always kept"""
+    raw = request.args.get("fields")
+    if not raw:
+        return list(allowed)
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ListingError(f"Unknown fields: {', '.join(unknown)}")
+    return ["id"] + [f for f in fields if f != "id"]
+
+
+def paginate(query, model, fields):
+    """Keyset page on id: loads only the requested columns, returns (rows, next_cursor)"""
+    limit = max(1, min(request.args.get("limit", DEFAULT_LIMIT, type=int), MAX_LIMIT))
+    if request.args.get("cursor"):
+        try:
+            cursor = UUID(request.args["cursor"])
+        except ValueError:
+            raise ListingError("Invalid cursor")
+        query = query.filter(model.id > cursor)
+
+    columns = [getattr(model, f) for f in fields if hasattr(model, f)]
+    rows = query.options(load_only(*columns)).order_by(model.id).limit(limit + 1).all()
+    next_cursor = str(rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def project(row, fields):
+    """Serialize only the loaded columns, so unrequested ones are never lazy-loaded"""
+    item = {}
+    for f in fields:
+        value = getattr(row, f)
+        item[f] = str(value) if isinstance(value, UUID) else value
+    return item
+
+
+def conditional_json(items, next_cursor):
+    """JSON array response with the next cursor in a header and an ETag for 304s"""
+    response = jsonify(items)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.add_etag()
+    return response.make_conditional(request)
@@ -0,0 +1,10 @@
+from flask import Blueprint, Response
+from app.services.metrics import render
+
+metrics_bp = Blueprint("metrics", __name__)
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus exposition of the crawl metrics of this process"""
+    body, content_type = render()
+    return Response(body, content_type=content_type)
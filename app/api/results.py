@@ -0,0 +1,142 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flasgger import swag_from
+from app.models.results import Result
+from app.schemas.results import Result as ResultOut
+from app.services.exporter import export_columns, iter_results, to_csv, to_ndjson
+from sqlalchemy import tuple_
+from datetime import datetime
+from uuid import UUID
+import base64
+import json
+
+results_bp = Blueprint("results", __name__)
+
+CONTENTS_PREFIX = "contents."
+MAX_LIMIT = 1000
+
+
+def encode_cursor(result):
+    raw = json.dumps([result.time_stamp.isoformat(), str(result.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    time_stamp, result_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return datetime.fromisoformat(time_stamp), UUID(result_id)
+
+
+def parse_value(raw):
+    # contents.price=1500 khớp số 1500, contents.name=abc khớp chuỗi "abc"
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+@results_bp.route("/results", methods=["GET"])
+@swag_from({
+    "tags": ["Results"],
+    "parameters": [
+        {"name": "source_id", "in": "query", "type": "string", "description": "UUID of the source"},
+        {"name": "since", "in": "query", "type": "string", "description": "ISO time, inclusive"},
+        {"name": "until", "in": "query", "type": "string", "description": "ISO time, exclusive"},
+        {"name": "has", "in": "query", "type": "string", "description": "Comma separated keys that contents must have"},
+        {"name": "contents.<field>", "in": "query", "type": "string",
+         "description": "Exact match on a contents field, e.g. contents.city=Hanoi (JSON values like 1500 or true are typed)"},
+        {"name": "limit", "in": "query", "type": "integer", "default": 100, "description": f"Page size, max {MAX_LIMIT}"},
+        {"name": "cursor", "in": "query", "type": "string", "description": "next_cursor of the previous page"}
+    ],
+    "responses": {
+        200: {
+            "description": "Results, newest first",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "items": {"type": "array", "items": ResultOut.schema()},
+                    "next_cursor": {"type": "string"}
+                }
+            }
+        },
+        400: {"description": "Invalid filter or cursor"}
+    }
+})
+def list_results():
+    """List results with keyset pagination on (time_stamp, id)"""
+    args = request.args
+    query = Result.query
+    try:
+        if args.get("source_id"):
+            query = query.filter(Result.source_id == UUID(args["source_id"]))
+        if args.get("since"):
+            query = query.filter(Result.time_stamp >= datetime.fromisoformat(args["since"]))
+        if args.get("until"):
+            query = query.filter(Result.time_stamp < datetime.fromisoformat(args["until"]))
+        if args.get("cursor"):
+            time_stamp, result_id = decode_cursor(args["cursor"])
+            query = query.filter(tuple_(Result.time_stamp, Result.id) < tuple_(time_stamp, result_id))
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Invalid filter or cursor: {e}"}), 400
+
+    # Các điều kiện trên contents dùng @> và ? để đi qua GIN index
+    matches = {
+        key[len(CONTENTS_PREFIX):]: parse_value(value)
+        for key, value in args.items()
+        if key.startswith(CONTENTS_PREFIX) and len(key) > len(CONTENTS_PREFIX)
+    }
+    if matches:
+        query = query.filter(Result.contents.contains(matches))
+    for key in filter(None, (k.strip() for k in args.get("has", "").split(","))):
+        query = query.filter(Result.contents.has_key(key))
+
+    limit = max(1, min(args.get("limit", 100, type=int), MAX_LIMIT))
+    rows = (
+        query.order_by(Result.time_stamp.desc(), Result.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return jsonify({
+        "items": [ResultOut.model_validate(row).model_dump(mode="json") for row in rows],
+        "next_cursor": encode_cursor(rows[-1]) if has_more else None
+    }), 200
+
+
+@results_bp.route("/results/export", methods=["GET"])
+@swag_from({
+    "tags": ["Results"],
+    "parameters": [
+        {"name": "source_id", "in": "query", "type": "string", "required": True, "description": "UUID of the source"},
+        {"name": "format", "in": "query", "type": "string", "enum": ["ndjson", "csv"], "default": "ndjson"},
+        {"name": "since", "in": "query", "type": "string", "description": "ISO time, inclusive"},
+        {"name": "until", "in": "query", "type": "string", "description": "ISO time, exclusive"}
+    ],
+    "responses": {
+        200: {"description": "Chunked NDJSON or CSV, one row per result with contents flattened into columns"},
+        400: {"description": "Invalid parameters"}
+    }
+})
+def export_results():
+    """Stream every result of a source; use `flask export-results` for Parquet files"""
+    args = request.args
+    fmt = args.get("format", "ndjson").lower()
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+    try:
+        source_id = str(UUID(args.get("source_id", "")))
+        since = datetime.fromisoformat(args["since"]) if args.get("since") else None
+        until = datetime.fromisoformat(args["until"]) if args.get("until") else None
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameters: {e}"}), 400
+
+    results = iter_results(source_id, since, until)
+    if fmt == "csv":
+        body, mimetype = to_csv(results, export_columns(source_id)), "text/csv"
+    else:
+        body, mimetype = to_ndjson(results), "application/x-ndjson"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=results_{source_id}.{fmt}"}
+    )
@@ -5,9 +5,29 @@ from app.schemas.sources import SourceCreate, SourceUpdate, SourceOut
 from app import db
 from pydantic import ValidationError
 from uuid import UUID
+from app.api.listing import ListingError, conditional_json, paginate, project, requested_fields
+from app.services.fetcher import forget_strategy
 
 sources_bp = Blueprint("sources", __name__)
 
+def source_to_dict(source):
+    # Trả về dữ liệu thủ công để tránh lỗi Pydantic
+    return {
+        "id": str(source.id),
+        "url": source.url,
+        "link_selector": source.link_selector,
+        "status": source.status,
+        "threads": source.threads,
+        "description": source.description,
+        "card_information": source.card_information,
+        "fetch_strategy": source.fetch_strategy,
+        "next_selector": source.next_selector,
+        "pagination_pattern": source.pagination_pattern,
+        "ready_strategy": source.ready_strategy,
+        "scroll_steps": source.scroll_steps,
+        "block_profile": source.block_profile
+    }
+
 @sources_bp.route("/sources", methods=["POST"])
 @swag_from({
     "tags": ["Sources"],
@@ -24,7 +44,11 @@ sources_bp = Blueprint("sources", __name__)
                     "threads": {"type": "integer", "example": 4},
                     "description": {"type": "string", "example": "Test source"},
                     "card_information": {"type": "string", "example": "Card info"},
-                    "status": {"type": "string", "example": "ACTIVE"}
+                    "status": {"type": "string", "example": "ACTIVE"},
+                    "next_selector": {"type": "string", "example": "a.next"},
+                    "ready_strategy": {"type": "string", "example": "selector"},
+                    "scroll_steps": {"type": "integer", "example": 5},
+                    "block_profile": {"type": "string", "example": "strict"}
                 },
                 "required": ["url", "link_selector", "threads", "description", "card_information"]
             }
@@ -45,23 +69,26 @@ def create_source():
     db.session.add(source)
     db.session.commit()
 
-    # Trả về dữ liệu thủ công để tránh lỗi Pydantic
-    return jsonify({
-        "id": str(source.id),
-        "url": source.url,
-        "link_selector": source.link_selector,
-        "status": source.status,
-        "threads": source.threads,
-        "description": source.description,
-        "card_information": source.card_information
-    }), 201
+    return jsonify(source_to_dict(source)), 201
+
+SOURCE_FIELDS = [
+    "id", "url", "link_selector", "status", "threads", "description", "card_information",
+    "fetch_strategy", "next_selector", "pagination_pattern", "ready_strategy", "scroll_steps", "block_profile"
+]
 
 @sources_bp.route("/sources", methods=["GET"])
 @swag_from({
     "tags": ["Sources"],
+    "parameters": [
+        {"name": "limit", "in": "query", "type": "integer", "default": 100, "description": "Page size, max 1000"},
+        {"name": "cursor", "in": "query", "type": "string", "description": "X-Next-Cursor header of the previous page"},
+        {"name": "fields", "in": "query", "type": "string", "description": "Comma separated fields to return, e.g. id,url"},
+        {"name": "status", "in": "query", "type": "string", "description": "Only sources with this status"},
+        {"name": "If-None-Match", "in": "header", "type": "string", "description": "ETag of a previous response"}
+    ],
     "responses": {
         200: {
-            "description": "List of sources",
+            "description": "Page of sources ordered by id; X-Next-Cursor is set when more remain",
             "schema": {
                 "type": "array",
                 "items": {
@@ -73,24 +100,31 @@ def create_source():
                         "status": {"type": "string"},
                         "threads": {"type": "integer"},
                         "description": {"type": "string"},
-                        "card_information": {"type": "string"}
+                        "card_information": {"type": "string"},
+                        "fetch_strategy": {"type": "string"},
+                        "next_selector": {"type": "string"},
+                        "pagination_pattern": {"type": "string"},
+                        "ready_strategy": {"type": "string"},
+                        "scroll_steps": {"type": "integer"},
+                        "block_profile": {"type": "string"}
                     }
                 }
             }
-        }
+        },
+        304: {"description": "Not modified since the ETag in If-None-Match"},
+        400: {"description": "Invalid cursor or fields"}
     }
 })
 def list_sources():
-    sources = Source.query.all()
-    return jsonify([{
-        "id": str(source.id),
-        "url": source.url,
-        "link_selector": source.link_selector,
-        "status": source.status,
-        "threads": source.threads,
-        "description": source.description,
-        "card_information": source.card_information
-    } for source in sources]), 200
+    try:
+        fields = requested_fields(SOURCE_FIELDS)
+        query = Source.query
+        if request.args.get("status"):
+            query = query.filter_by(status=request.args["status"].upper())
+        sources, next_cursor = paginate(query, Source, fields)
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
+    return conditional_json([project(source, fields) for source in sources], next_cursor)
 
 @sources_bp.route("/sources/<source_id>", methods=["GET"])
 @swag_from({
@@ -116,7 +150,13 @@ def list_sources():
                     "status": {"type": "string"},
                     "threads": {"type": "integer"},
                     "description": {"type": "string"},
-                    "card_information": {"type": "string"}
+                    "card_information": {"type": "string"},
+                    "fetch_strategy": {"type": "string"},
+                    "next_selector": {"type": "string"},
+                    "pagination_pattern": {"type": "string"},
+                    "ready_strategy": {"type": "string"},
+                    "scroll_steps": {"type": "integer"},
+                    "block_profile": {"type": "string"}
                 }
             }
         },
@@ -134,15 +174,7 @@ def get_source(source_id):
     if not source:
         return jsonify({"error": "Source not found"}), 404
 
-    return jsonify({
-        "id": str(source.id),
-        "url": source.url,
-        "link_selector": source.link_selector,
-        "status": source.status,
-        "threads": source.threads,
-        "description": source.description,
-        "card_information": source.card_information
-    }), 200
+    return jsonify(source_to_dict(source)), 200
 
 @sources_bp.route("/sources/<source_id>", methods=["PUT"])
 @swag_from({
@@ -167,7 +199,13 @@ def get_source(source_id):
                     "threads": {"type": "integer"},
                     "description": {"type": "string"},
                     "card_information": {"type": "string"},
-                    "status": {"type": "string"}
+                    "status": {"type": "string"},
+                    "fetch_strategy": {"type": "string", "example": "http"},
+                    "next_selector": {"type": "string", "example": "a.next"},
+                    "pagination_pattern": {"type": "string", "example": "https://example.com/list?page={page}"},
+                    "ready_strategy": {"type": "string", "example": "scroll"},
+                    "scroll_steps": {"type": "integer", "example": 5},
+                    "block_profile": {"type": "string", "example": "media"}
                 }
             }
         }
@@ -193,19 +231,20 @@ def update_source(source_id):
     except ValidationError as e:
         return jsonify({"error": str(e)}), 400
 
-    for key, value in data.dict(exclude_unset=True).items():
+    updates = data.dict(exclude_unset=True)
+    url_changed = "url" in updates and updates["url"] != source.url
+    if url_changed:
+        # Pattern và strategy đã học thuộc về URL cũ, học lại ở lần crawl sau
+        updates.setdefault("pagination_pattern", None)
+        updates.setdefault("fetch_strategy", None)
+    for key, value in updates.items():
         setattr(source, key, value)
     db.session.commit()
+    if url_changed or "fetch_strategy" in updates:
+        # Strategy ghim qua API hoặc đã reset phải có hiệu lực ngay, không đợi restart
+        forget_strategy(str(source.id))
 
-    return jsonify({
-        "id": str(source.id),
-        "url": source.url,
-        "link_selector": source.link_selector,
-        "status": source.status,
-        "threads": source.threads,
-        "description": source.description,
-        "card_information": source.card_information
-    }), 200
+    return jsonify(source_to_dict(source)), 200
 
 @sources_bp.route("/sources/<source_id>", methods=["DELETE"])
 @swag_from({
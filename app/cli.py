@@ -0,0 +1,44 @@
+import sys
+from uuid import UUID
+
+import click
+
+from app.services.exporter import (
+    FORMATS, export_columns, iter_results, require_pyarrow, to_csv, to_ndjson, write_parquet,
+)
+
+
+def register_cli(app):
+    @app.cli.command("export-results")
+    @click.option("--source-id", required=True, help="UUID of the source to export")
+    @click.option("--format", "fmt", type=click.Choice(FORMATS), default="ndjson", show_default=True)
+    @click.option("--output", "-o", help="Output file; '-' or empty writes NDJSON/CSV to stdout")
+    @click.option("--since", type=click.DateTime(), help="Only results at or after this time")
+    @click.option("--until", type=click.DateTime(), help="Only results before this time")
+    def export_results(source_id, fmt, output, since, until):
+        """Stream a source's results to NDJSON, CSV or Parquet with constant memory"""
+        source_id = str(UUID(source_id))
+        if fmt == "parquet":
+            if not output or output == "-":
+                raise click.UsageError("Parquet export needs --output FILE")
+            try:
+                require_pyarrow()
+            except RuntimeError as e:
+                raise click.ClickException(str(e))
+        results = iter_results(source_id, since, until)
+
+        if fmt == "parquet":
+            written = write_parquet(results, export_columns(source_id), output)
+            click.echo(f"Wrote {written} results to {output}", err=True)
+            return
+
+        chunks = to_csv(results, export_columns(source_id)) if fmt == "csv" else to_ndjson(results)
+        stream = sys.stdout if not output or output == "-" else open(output, "w", encoding="utf-8", newline="")
+        try:
+            for chunk in chunks:
+                stream.write(chunk)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        if stream is not sys.stdout:
+            click.echo(f"Wrote {fmt} export to {output}", err=True)
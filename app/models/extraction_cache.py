@@ -0,0 +1,14 @@
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import Column, String, Integer, DateTime
+from datetime import datetime
+from app import db
+
+class ExtractionCache(db.Model):
+    __tablename__ = "extraction_cache"
+
+    key = Column(String(64), primary_key=True)                      # sha256(normalized text + schema fingerprint)
+    schema_fingerprint = Column(String(64), nullable=False, index=True)
+    contents = Column(JSONB, nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    last_used_at = Column(DateTime, nullable=False, default=datetime.now, index=True)
@@ -0,0 +1,24 @@
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, String, Integer, DateTime, Boolean
+from uuid import uuid4
+from datetime import datetime
+from app import db
+
+class CrawlJob(db.Model):
+    __tablename__ = "crawl_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4, unique=True, nullable=False)
+    web_id = Column(UUID(as_uuid=True), nullable=True)                  # None = tất cả source ACTIVE
+    state = Column(String(20), nullable=False, default='PENDING')       # PENDING | RUNNING | COMPLETED | FAILED | STOPPED
+    incremental = Column(Boolean, nullable=False, default=False)        # Bỏ qua URL đã crawl trong cửa sổ freshness
+    distributed = Column(Boolean, nullable=False, default=False)        # Chạy bởi worker.py qua bảng crawl_tasks
+    listings = Column(Integer, nullable=False, default=0)
+    links_found = Column(Integer, nullable=False, default=0)
+    saved = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    unchanged = Column(Integer, nullable=False, default=0)              # Trang không đổi, bỏ qua extract + ghi DB
+    progress = Column(JSONB, nullable=False, default=dict)              # Tiến độ theo từng source
+    error = Column(String(500), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -5,9 +5,20 @@ from app import db
 
 class Result(db.Model):
     __tablename__ = "results"
+    __table_args__ = (
+        db.UniqueConstraint('source_id', 'url', name='uq_results_source_url'),  # Mỗi URL giữ một bản ghi mới nhất
+        # Keyset pagination của /api/results theo (time_stamp, id)
+        db.Index('ix_results_source_time', 'source_id', 'time_stamp', 'id'),
+        db.Index('ix_results_time', 'time_stamp', 'id'),
+        db.Index('ix_results_contents', 'contents', postgresql_using='gin'),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4, unique=True, nullable=False)
     source_id = Column(UUID(as_uuid=True), ForeignKey('sources.id'), nullable=False)  
     url = Column(String(500), nullable=False)  
     contents = Column(JSONB, nullable=False)      
-    time_stamp = Column(DateTime, nullable=False)
\ No newline at end of file
+    time_stamp = Column(DateTime, nullable=False)
+    etag = Column(String(255), nullable=True)               # Validators để gửi conditional request lần sau
+    last_modified = Column(String(64), nullable=True)
+    content_hash = Column(String(64), nullable=True)        # sha256 của text đã rút gọn
+    schema_fingerprint = Column(String(64), nullable=True)  # Schema thuộc tính lúc trích xuất
\ No newline at end of file
@@ -2,6 +2,7 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import Column, String, Integer
 from uuid import uuid4
 from app import db
+from app.models.attributes import Attribute
 
 class Source(db.Model):
     __tablename__ = "sources"
@@ -12,4 +13,13 @@ class Source(db.Model):
     status = db.Column(String(20), nullable=False, default='ACTIVE')    
     threads = Column(Integer, nullable=False)
     description = Column(String(255), nullable=False)      
-    card_information = Column(String(255), nullable=False)  
\ No newline at end of file
+    card_information = Column(String(255), nullable=False)  
+    fetch_strategy = Column(String(20), nullable=True)      # 'http' | 'browser', learned by the fetcher
+    next_selector = Column(String(255), nullable=True)      # CSS selector of the "next page" link
+    pagination_pattern = Column(String(500), nullable=True) # URL template with {page}, detected on first crawl
+    ready_strategy = Column(String(20), nullable=True)      # 'selector' | 'network_idle' | 'scroll', default 'selector'
+    scroll_steps = Column(Integer, nullable=True)           # Max scrolls for the 'scroll' strategy
+    block_profile = Column(String(20), nullable=True)       # 'none' | 'media' | 'strict', resources Chrome skips
+
+    # Read-only: attributes are still created and edited through their own API
+    attributes = db.relationship(Attribute, viewonly=True, order_by=Attribute.name)
\ No newline at end of file
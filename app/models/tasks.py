@@ -0,0 +1,25 @@
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Index
+from uuid import uuid4
+from datetime import datetime
+from app import db
+
+class CrawlTask(db.Model):
+    __tablename__ = "crawl_tasks"
+    __table_args__ = (
+        db.UniqueConstraint('job_id', 'kind', 'url', name='uq_crawl_tasks_job_kind_url'),
+        Index('ix_crawl_tasks_claim', 'state', 'lease_expires_at'),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4, unique=True, nullable=False)
+    job_id = Column(UUID(as_uuid=True), ForeignKey('crawl_jobs.id', ondelete='CASCADE'), nullable=False, index=True)
+    source_id = Column(UUID(as_uuid=True), ForeignKey('sources.id', ondelete='CASCADE'), nullable=False)
+    kind = Column(String(20), nullable=False)                           # listing | product
+    url = Column(Text, nullable=False)
+    state = Column(String(20), nullable=False, default='PENDING')       # PENDING | LEASED | DONE | FAILED
+    attempts = Column(Integer, nullable=False, default=0)
+    leased_by = Column(String(100), nullable=True)                      # Worker đang giữ task
+    lease_expires_at = Column(DateTime, nullable=True)                  # Hết hạn thì worker khác được nhận lại
+    error = Column(String(500), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now)
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+class JobOut(BaseModel):
+    id: UUID
+    web_id: Optional[UUID] = None
+    state: str
+    incremental: bool
+    distributed: bool
+    listings: int
+    links_found: int
+    saved: int
+    failed: int
+    unchanged: int
+    progress: Dict[str, Any]
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,11 @@
 from pydantic import BaseModel, HttpUrl
 from uuid import UUID
-from typing import Optional
+from typing import Literal, Optional
+
+# Phải khớp với fetcher.py, readiness.py và resource_blocking.py
+FetchStrategy = Literal['http', 'browser']
+ReadyStrategy = Literal['selector', 'network_idle', 'scroll']
+BlockProfile = Literal['none', 'media', 'strict']
 
 class SourceBase(BaseModel):
     url: str  # Validate URL hợp lệ
@@ -9,6 +14,12 @@ class SourceBase(BaseModel):
     description: str
     card_information: str
     status: Optional[str] = "ACTIVE"  # Giá trị mặc định là "ACTIVE"
+    fetch_strategy: Optional[FetchStrategy] = None  # Để trống để crawler tự chọn
+    next_selector: Optional[str] = None  # Selector của link "trang sau"
+    pagination_pattern: Optional[str] = None  # Ví dụ: https://example.com/list?page={page}
+    ready_strategy: Optional[ReadyStrategy] = None
+    scroll_steps: Optional[int] = None  # Số lần cuộn tối đa cho 'scroll'
+    block_profile: Optional[BlockProfile] = None  # Để trống để dùng mặc định
 
 class SourceCreate(SourceBase):
     pass  # Kế thừa tất cả các trường từ SourceBase để tạo mới
@@ -20,6 +31,12 @@ class SourceUpdate(BaseModel):
     description: Optional[str] = None
     card_information: Optional[str] = None
     status: Optional[str] = None  # Các trường là tùy chọn để cập nhật
+    fetch_strategy: Optional[FetchStrategy] = None
+    next_selector: Optional[str] = None
+    pagination_pattern: Optional[str] = None
+    ready_strategy: Optional[ReadyStrategy] = None
+    scroll_steps: Optional[int] = None
+    block_profile: Optional[BlockProfile] = None
 
 class SourceOut(SourceBase):
     id: UUID  # Thêm id để trả về thông tin đầy đủ
@@ -0,0 +1,136 @@
+#batch_extractor.py
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from pydantic import BaseModel, create_model
+
+from app.config import Config
+from app.services import llm_client
+from app.services.crawler import extractObject, modelToDict
+from app.services.metrics import EXTRACTION_FAILURES, UNKNOWN_SOURCE
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_PROMPT = (
+    "Each PAGE below is a separate listing. Extract exactly one object per page, "
+    "in the same order, and copy the page's URL verbatim into page_url.\n"
+)
+
+
+class BatchExtractor:
+    """Packs several reduced pages of one source into a single Gemini request.
+
+    Pages are queued with submit(); a collector thread cuts a batch when
+    batch_size pages are waiting or the oldest one has waited max_wait seconds.
+    A batch that fails validation or drops pages is retried one page at a time.
+    """
+
+    def __init__(self, api_key: str, pydanticClass: BaseModel,
+                 batch_size: int = None, max_wait: float = None,
+                 executor: ThreadPoolExecutor = None, source: str = None):
+        self.api_key = api_key
+        self.source = source
+        self.pydanticClass = pydanticClass
+        self.batch_size = batch_size or Config.EXTRACT_BATCH_SIZE
+        self.max_wait = max_wait if max_wait is not None else Config.EXTRACT_BATCH_MAX_WAIT
+        self.item_model = create_model('DynamicBatchItem', page_url=(str, ...), __base__=pydanticClass)
+        self.batch_model = create_model('DynamicBatch', items=(List[self.item_model], ...))
+        self._pending: List[Tuple[str, str, Future, float]] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._pending_flushes: List[Future] = []
+        # Callers may share one executor between extractors to cap LLM calls globally
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=Config.CRAWL_EXTRACT_CONCURRENCY,
+            thread_name_prefix='extract',
+        )
+        self._collector = threading.Thread(target=self._collect, name='batch-collector', daemon=True)
+        self._collector.start()
+        self.batches = 0
+        self.fallbacks = 0
+
+    def submit(self, url: str, text: str) -> Future:
+        """Queue one page; the future resolves to its extracted dict"""
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BatchExtractor is closed")
+            self._pending.append((url, text, future, time.monotonic()))
+            self._cond.notify()
+        return future
+
+    def _collect(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                while len(self._pending) < self.batch_size and not self._closed:
+                    remaining = self._pending[0][3] + self.max_wait - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+            self._pending_flushes.append(self._executor.submit(self._flush, batch))
+
+    def _extract_batch(self, batch) -> Dict[str, Dict]:
+        content = BATCH_PROMPT + "".join(
+            f"\n### PAGE {i + 1}\nURL: {url}\n{text}\n" for i, (url, text, _, _) in enumerate(batch)
+        )
+        resp = llm_client.complete(
+            messages=[{"role": "user", "content": content}],
+            response_model=self.batch_model,
+            api_key=self.api_key,
+            source=self.source,
+        )
+        results = {}
+        for item in resp.items:
+            data = modelToDict(item)
+            results[data.pop('page_url').strip()] = data
+        return results
+
+    def _extract_single(self, url: str, text: str, future: Future):
+        try:
+            future.set_result(extractObject(text, self.api_key, self.pydanticClass, self.source))
+        except Exception as e:
+            EXTRACTION_FAILURES.labels(self.source or UNKNOWN_SOURCE).inc()
+            future.set_exception(e)
+
+    def _flush(self, batch):
+        if len(batch) == 1:
+            url, text, future, _ = batch[0]
+            self._extract_single(url, text, future)
+            return
+
+        try:
+            results = self._extract_batch(batch)
+            self.batches += 1
+        except Exception as e:
+            logger.warning(f"Batch of {len(batch)} pages failed, falling back to single calls: {e}")
+            results = {}
+
+        for url, text, future, _ in batch:
+            if url in results:
+                future.set_result(results[url])
+            else:
+                self.fallbacks += 1
+                self._extract_single(url, text, future)
+
+    def close(self):
+        """Flush whatever is still queued and stop the collector"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._collector.join()
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+        else:
+            for flush in self._pending_flushes:
+                flush.result()
@@ -0,0 +1,383 @@
+#crawl_engine.py
+import asyncio
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from app.config import Config
+from app.services.crawler import (
+    getHtmlFile,
+    getLinks,
+    add_web_page_content,
+    stop_event,
+)
+from app.services.batch_extractor import BatchExtractor
+from app.services.driver_pool import driver_pool
+from app.services.extraction_cache import extraction_cache, content_hash, schema_fingerprint
+from app.services.fetcher import FetchedPage, fetch_detail
+from app.services.metrics import LINKS_PER_LISTING
+from app.services.politeness import scheduler
+from app.services.reduce_pool import reduce_pool
+from app.services.reducer import reduce_page
+from app.services.seen_index import SeenUrlIndex
+
+
+logger = logging.getLogger(__name__)
+
+LISTING = 'listing'
+PRODUCT = 'product'
+
+
+@dataclass
+class SourceState:
+    """Per-source settings shared by every work item of that source"""
+    config: Dict
+    pydantic_model: BaseModel
+    fetch_sem: asyncio.Semaphore
+    seen: SeenUrlIndex
+    extractor: BatchExtractor = None
+    stats: Dict = field(default_factory=dict)
+    job_id: Optional[str] = None        # Set by the distributed worker
+
+
+@dataclass
+class WorkItem:
+    kind: str
+    url: str
+    source: SourceState
+    # Filled in as the item moves through the product stages
+    previous: Optional[Dict] = None
+    fetched: Optional[FetchedPage] = None
+    text: Optional[str] = None
+    text_hash: Optional[str] = None
+    content: Optional[Dict] = None
+    failed: bool = False
+
+
+class Stage:
+    """One pipeline step: a bounded input queue drained by its own workers"""
+
+    def __init__(self, name: str, handler: Callable, workers: int, maxsize: int):
+        self.name = name
+        self.handler = handler
+        self.workers = max(workers, 1)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.next: Optional['Stage'] = None
+        self.busy = 0
+        self.processed = 0
+        self.busy_seconds = 0.0
+
+    def stats(self) -> Dict:
+        return {
+            'queued': self.queue.qsize(),
+            'maxsize': self.queue.maxsize,
+            'workers': self.workers,
+            'busy': self.busy,
+            'processed': self.processed,
+            'busy_seconds': round(self.busy_seconds, 1),
+        }
+
+
+# Engines currently running in this process, for /api/stats
+running_engines = weakref.WeakSet()
+
+
+def pipeline_stats() -> List[Dict]:
+    return [engine.stage_stats() for engine in list(running_engines)]
+
+
+class CrawlEngine:
+    """Asyncio crawl pipeline: listing fetch -> detail fetch -> reduce -> extract -> persist.
+
+    Each stage has its own worker count and a bounded queue in front of it, so a
+    slow stage pushes back on the ones feeding it instead of piling up pages in
+    memory. Blocking work (Selenium, HTTP, SQLAlchemy) runs on a thread pool inside
+    a fresh app context, page reduction in the reduce process pool, LLM calls on
+    the batch extractors' shared executor and DB writes in the result writer.
+    """
+
+    def __init__(self, app, api_key: Optional[str],
+                 fetch_concurrency: int = None,
+                 extract_concurrency: int = None,
+                 on_progress: Optional[Callable[[Dict, Dict], None]] = None,
+                 stop: Optional[threading.Event] = None):
+        self.app = app
+        # Each job passes its own flag; the process-wide stop_event is for worker.py
+        self.stop = stop or stop_event
+        self.api_key = api_key
+        self.on_progress = on_progress
+        self.fetch_concurrency = fetch_concurrency or Config.CRAWL_FETCH_CONCURRENCY
+        self.extract_concurrency = extract_concurrency or Config.CRAWL_EXTRACT_CONCURRENCY
+        self._sources: List[tuple] = []
+        self._stages: List[Stage] = []
+        self.stats = {
+            'listings': 0,
+            'links_found': 0,
+            'products': 0,
+            'saved': 0,
+            'failed': 0,
+            'cached': 0,
+            'chars_before': 0,
+            'chars_after': 0,
+            'skipped_fresh': 0,
+            'skipped_duplicate': 0,
+            'unchanged': 0,
+        }
+        self.source_stats: Dict[str, Dict] = {}
+
+    def add_source(self, config: Dict, pydantic_model: BaseModel, page_urls: List[str],
+                   seen: SeenUrlIndex = None):
+        self._sources.append((config, pydantic_model, page_urls, seen or SeenUrlIndex(config['id'])))
+
+    def _count(self, state: SourceState, key: str, n: int = 1):
+        self.stats[key] += n
+        state.stats[key] = state.stats.get(key, 0) + n
+
+    async def _call(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._in_context, fn, *args)
+
+    def _in_context(self, fn, *args):
+        with self.app.app_context():
+            return fn(*args)
+
+    def _fetch_links(self, url: str, config: Dict) -> Optional[List[str]]:
+        """Product links of a listing page, or None when the page could not be loaded"""
+        driver, _ = getHtmlFile(url, None, False, config)
+        if not driver:
+            return None
+        try:
+            return getLinks(driver, config['link_selector'])
+        finally:
+            driver_pool.release(driver)
+
+    async def _polite(self, url: str):
+        # Wait for the host's slot here, not on an executor thread holding a fetch slot
+        wait = await self._call(scheduler.reserve, url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _process_listing(self, item: WorkItem):
+        """Queue the new product links of a listing; False when the listing failed to load"""
+        await self._polite(item.url)
+        async with self._fetch_sem, item.source.fetch_sem:
+            links = await self._call(self._fetch_links, item.url, item.source.config)
+        if links is None:
+            self._count(item.source, 'failed')
+            return False
+        self._count(item.source, 'listings')
+        self._count(item.source, 'links_found', len(links))
+        LINKS_PER_LISTING.labels(item.source.config['id']).observe(len(links))
+        print(f"Found {len(links)} links using selector: {item.source.config['link_selector']}")
+        new_links = []
+        for link in links:
+            if not link:
+                continue
+            status = item.source.seen.check(link)
+            if status == 'new':
+                new_links.append(link)
+            else:
+                self._count(item.source, 'skipped_' + status)
+        await self._enqueue_products(item.source, new_links)
+
+    async def _enqueue_products(self, source: SourceState, links: List[str]):
+        # Blocks while the detail queue is full: backpressure on listing discovery
+        for link in links:
+            await self._detail_stage.queue.put(WorkItem(PRODUCT, link, source))
+
+    async def _fetch_product(self, item: WorkItem) -> Optional[WorkItem]:
+        config = item.source.config
+        # Validators only count when the page was extracted with today's attributes;
+        # otherwise it is fetched unconditionally and extracted again
+        item.previous = item.source.seen.validators(item.url, schema_fingerprint(item.source.pydantic_model))
+        await self._polite(item.url)
+        async with self._fetch_sem, item.source.fetch_sem:
+            fetched = await self._call(fetch_detail, item.url, config, None, item.previous, False)
+        if fetched.not_modified:
+            self._count(item.source, 'unchanged')
+            return None
+        if fetched.html is None:
+            self._count(item.source, 'failed')
+            item.failed = True
+            return None
+        item.fetched = fetched
+        return item
+
+    async def _reduce_product(self, item: WorkItem) -> Optional[WorkItem]:
+        args = (item.fetched.html, item.source.config.get('card_information'), item.url)
+        if reduce_pool.size > 0:
+            # Parsing is CPU-bound: it runs in the reduce process pool, off this process's GIL
+            page = await asyncio.wrap_future(reduce_pool.submit(*args))
+        else:
+            page = await self._call(reduce_page, *args)
+        # Only the validators travel further down the pipeline
+        item.fetched.html = None
+        self._count(item.source, 'chars_before', page.chars_before)
+        self._count(item.source, 'chars_after', page.chars_after)
+        item.text = page.prompt
+
+        # Same reduced text as last time: nothing to extract or write
+        item.text_hash = content_hash(item.text)
+        if item.previous and item.previous.get('content_hash') == item.text_hash:
+            self._count(item.source, 'unchanged')
+            return None
+        return item
+
+    async def _extract_product(self, item: WorkItem) -> Optional[WorkItem]:
+        model = item.source.pydantic_model
+        content = await self._call(extraction_cache.get, item.text, model)
+        if content is not None:
+            self._count(item.source, 'cached')
+        else:
+            # The batch extractor's shared executor caps concurrent LLM calls
+            try:
+                content = await asyncio.wrap_future(item.source.extractor.submit(item.url, item.text))
+            except Exception as e:
+                print(f"Error extracting {item.url}: {e}")
+                self._count(item.source, 'failed')
+                item.failed = True
+                return None
+            await self._call(extraction_cache.put, item.text, model, content)
+        content['url'] = item.url
+        item.content = content
+        return item
+
+    async def _persist_product(self, item: WorkItem) -> Optional[WorkItem]:
+        # Only enqueues; the result writer batches the INSERTs off the hot path
+        await self._call(
+            add_web_page_content, item.source.config['id'], item.url, item.content, None,
+            item.fetched.etag, item.fetched.last_modified, item.text_hash,
+            schema_fingerprint(item.source.pydantic_model),
+        )
+        self._count(item.source, 'products')
+        self._count(item.source, 'saved')
+        return None
+
+    def _product_steps(self) -> List[Callable]:
+        return [self._fetch_product, self._reduce_product, self._extract_product, self._persist_product]
+
+    async def _process_product(self, item: WorkItem) -> bool:
+        """Run one product page through every stage inline; False when it should be retried"""
+        for step in self._product_steps():
+            next_item = await step(item)
+            if next_item is None:
+                # Done early (unchanged, saved) or failed
+                return not item.failed
+            item = next_item
+        return True
+
+    async def _stage_worker(self, stage: Stage):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await stage.queue.get()
+            try:
+                if self.stop.is_set():
+                    continue
+                stage.busy += 1
+                started = loop.time()
+                try:
+                    next_item = await stage.handler(item)
+                finally:
+                    stage.busy -= 1
+                    stage.processed += 1
+                    stage.busy_seconds += loop.time() - started
+                if next_item is not None and stage.next is not None:
+                    # Waits while the next stage is saturated
+                    await stage.next.queue.put(next_item)
+            except Exception as e:
+                print(f"Error in {stage.name} stage for {item.url}: {e}")
+                self._count(item.source, 'failed')
+            finally:
+                stage.queue.task_done()
+
+    def _build_stages(self) -> List[Stage]:
+        maxsize = Config.CRAWL_STAGE_QUEUE_SIZE
+        # Listing queue is unbounded: it is seeded up front and nothing feeds it later
+        listing = Stage('listing', self._process_listing, Config.CRAWL_LISTING_CONCURRENCY, 0)
+        detail = Stage('detail_fetch', self._fetch_product, self.fetch_concurrency, maxsize)
+        reduce = Stage('reduce', self._reduce_product, Config.CRAWL_REDUCE_CONCURRENCY, maxsize)
+        # Enough workers parked on extraction futures to fill every batch
+        extract = Stage('extract', self._extract_product,
+                        self.extract_concurrency * Config.EXTRACT_BATCH_SIZE, maxsize)
+        persist = Stage('persist', self._persist_product, Config.CRAWL_PERSIST_CONCURRENCY, maxsize)
+        detail.next, reduce.next, extract.next = reduce, extract, persist
+        self._detail_stage = detail
+        return [listing, detail, reduce, extract, persist]
+
+    def stage_stats(self) -> Dict:
+        return {stage.name: stage.stats() for stage in self._stages}
+
+    async def _report_progress(self):
+        if self.on_progress is None:
+            return
+        stats = dict(self.stats, pipeline=self.stage_stats())
+        try:
+            await self._call(self.on_progress, stats, self.source_stats)
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
+
+    async def _reporter(self):
+        while True:
+            await asyncio.sleep(Config.JOB_PROGRESS_INTERVAL)
+            await self._report_progress()
+
+    def _open(self, threads: int):
+        """Create the shared fetch semaphore and executors"""
+        self._fetch_sem = asyncio.Semaphore(self.fetch_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='crawl')
+        self._extract_executor = ThreadPoolExecutor(max_workers=self.extract_concurrency, thread_name_prefix='extract')
+
+    def _new_state(self, config: Dict, pydantic_model: BaseModel, seen: SeenUrlIndex) -> SourceState:
+        state = SourceState(config, pydantic_model, asyncio.Semaphore(max(config['threads'], 1)), seen)
+        state.extractor = BatchExtractor(self.api_key, pydantic_model, executor=self._extract_executor,
+                                         source=config['id'])
+        return state
+
+    async def _close(self, extractors: List[BatchExtractor]):
+        for extractor in extractors:
+            extractor.close()
+        self._extract_executor.shutdown(wait=True)
+        await self._report_progress()
+        self._executor.shutdown(wait=True)
+
+    async def run(self) -> Dict:
+        """Crawl every added source until every stage drains or the stop flag is set"""
+        self._stages = self._build_stages()
+        # Every stage worker may be blocked on a thread at once
+        self._open(sum(stage.workers for stage in self._stages))
+
+        extractors = []
+        workers = [
+            asyncio.create_task(self._stage_worker(stage))
+            for stage in self._stages
+            for _ in range(stage.workers)
+        ]
+        reporter = asyncio.create_task(self._reporter())
+        running_engines.add(self)
+        try:
+            for config, pydantic_model, page_urls, seen in self._sources:
+                state = self._new_state(config, pydantic_model, seen)
+                extractors.append(state.extractor)
+                state.stats = {'url': config['url'], 'pages': len(page_urls)}
+                self.source_stats[config['id']] = state.stats
+                for url in page_urls:
+                    self._stages[0].queue.put_nowait(WorkItem(LISTING, url, state))
+
+            # Items only move forward, so each stage is final once the ones before it are
+            for stage in self._stages:
+                await stage.queue.join()
+        finally:
+            running_engines.discard(self)
+            for task in workers + [reporter]:
+                task.cancel()
+            await asyncio.gather(*workers, reporter, return_exceptions=True)
+            await self._close(extractors)
+        return self.stats
+
+    def run_sync(self) -> Dict:
+        return asyncio.run(self.run())
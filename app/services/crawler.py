@@ -1,30 +1,25 @@
 #crawler.py
-import undetected_chromedriver as uc
 import time
 import json
+import hashlib
 import uuid
-from httpx import TimeoutException
-import requests
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from datetime import date
+from typing import List, Dict, Optional
 from pydantic import create_model, BaseModel
-from bs4 import BeautifulSoup
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import google.generativeai as genai
+from sqlalchemy.orm import selectinload
 import threading
-from app import db
 from app.models.sources import Source
-from app.models.attributes import Attribute
-from app.models.results import Result
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-import os
-from dotenv import load_dotenv
 from flask import current_app
-import instructor
+from app.services.driver_pool import driver_pool
+from app.services.fetcher import STRATEGY_BROWSER
+from app.services.reduce_pool import reduce_pool
+from app.services import llm_client
+from app.services.result_writer import result_writer
+from app.services.politeness import scheduler
+from app.services.readiness import readiness
+from app.services.resource_blocking import apply_profile
+from app.services.metrics import record_fetch, source_label
 
 
 # Setup logging
@@ -32,15 +27,6 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-load_dotenv()
-
-
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not GOOGLE_API_KEY:
-    raise ValueError("GOOGLE_API_KEY not found in environment variables")
-genai.configure(api_key=GOOGLE_API_KEY)
-
-
 # Global stop event for thread control
 stop_event = threading.Event()
 
@@ -48,14 +34,34 @@ stop_event = threading.Event()
 def stopCrawl():
     """Set the stop event to terminate all running crawler threads"""
     stop_event.set()
+    driver_pool.shutdown()
+    reduce_pool.shutdown()
+    result_writer.flush()
     print("Stop signal received. Terminating crawler threads...")
 
 
-def get_all_web_crawl() -> List[Dict]:
-    """Fetch all active web crawl sources from the database"""
+def _attribute_to_dict(attr) -> Dict:
+    return {
+        'name': attr.name,
+        'type': attr.type,
+        'description': attr.description
+    }
+
+
+def get_all_web_crawl(web_id: Optional[str] = None, with_attributes: bool = False) -> List[Dict]:
+    """Fetch active web crawl sources, optionally one source and its attributes.
+
+    With ``with_attributes`` every source's attributes come from a single extra
+    selectinload query instead of one query per source.
+    """
     with current_app.app_context():  # Sử dụng current_app
         try:
-            sources = Source.query.filter_by(status='ACTIVE').all()
+            query = Source.query.filter_by(status='ACTIVE')
+            if web_id:
+                query = query.filter_by(id=uuid.UUID(web_id))
+            if with_attributes:
+                query = query.options(selectinload(Source.attributes))
+            sources = query.all()
             return [
                 {
                     'id': str(source.id),
@@ -63,7 +69,15 @@ def get_all_web_crawl() -> List[Dict]:
                     'link_selector': source.link_selector,
                     'threads': source.threads,
                     'description': source.description,
-                    'card_information': source.card_information
+                    'card_information': source.card_information,
+                    'fetch_strategy': source.fetch_strategy,
+                    'next_selector': source.next_selector,
+                    'pagination_pattern': source.pagination_pattern,
+                    'ready_strategy': source.ready_strategy,
+                    'scroll_steps': source.scroll_steps,
+                    'block_profile': source.block_profile,
+                    **({'attributes': [_attribute_to_dict(attr) for attr in source.attributes]}
+                       if with_attributes else {})
                 }
                 for source in sources
             ]
@@ -72,24 +86,6 @@ def get_all_web_crawl() -> List[Dict]:
             return []
 
 
-def get_web_crawl_attributes_by_web_crawl_id(web_id: str) -> List[Dict]:
-    """Fetch attributes for a specific web crawl source"""
-    with current_app.app_context():  # Sử dụng current_app
-        try:
-            attributes = Attribute.query.filter_by(source_id=uuid.UUID(web_id)).all()
-            return [
-                {
-                    'name': attr.name,
-                    'type': attr.type,
-                    'description': attr.description
-                }
-                for attr in attributes
-            ]
-        except Exception as e:
-            print(f"Error fetching attributes for web crawl ID {web_id}: {e}")
-            return []
-
-
 def create_dynamic_model_from_json(attributes: List[Dict]) -> BaseModel:
     """Create a dynamic Pydantic model based on the attributes"""
     field_definitions = {}
@@ -113,191 +109,136 @@ def create_dynamic_model_from_json(attributes: List[Dict]) -> BaseModel:
     return DynamicModel
 
 
+# Compiled DynamicModel classes by attribute fingerprint, plus which one each source uses
+_dynamic_models: Dict[str, BaseModel] = {}
+_source_fingerprints: Dict[str, str] = {}
+_dynamic_models_lock = threading.Lock()
+
 
+def attributes_fingerprint(attributes: List[Dict]) -> str:
+    canonical = sorted((attr['name'], attr['type'].lower()) for attr in attributes)
+    return hashlib.sha256(json.dumps(canonical).encode('utf-8')).hexdigest()
 
 
+def get_dynamic_model(source_id: str, attributes: List[Dict]) -> BaseModel:
+    """Cached create_dynamic_model_from_json: the class is only rebuilt when the schema changes"""
+    fingerprint = attributes_fingerprint(attributes)
+    with _dynamic_models_lock:
+        model = _dynamic_models.get(fingerprint)
+        if model is None:
+            model = create_dynamic_model_from_json(attributes)
+            _dynamic_models[fingerprint] = model
+        _source_fingerprints[source_id] = fingerprint
+        return model
 
-# def getHtmlFile(url: str) -> tuple:
-#     try:
-#         options = uc.ChromeOptions()
-#         options.add_argument('--no-sandbox')
-#         options.add_argument('--disable-dev-shm-usage')
-#         options.add_argument('--disable-blink-features=AutomationControlled')  # Ẩn dấu hiệu tự động hóa
-#         options.add_experimental_option('excludeSwitches', ['enable-automation'])  # Loại bỏ cờ automation
-#         options.add_experimental_option('useAutomationExtension', False)  # Tắt extension automation
-#         driver = uc.Chrome(options=options)
-#         driver.get(url)
-#         time.sleep(5)  # Tăng thời gian chờ để trang tải hoàn toàn
-#         return driver, driver.page_source
-#     except Exception as e:
-#         print(f"Error loading URL {url}: {e}")
-#         return None, None
 
+def invalidate_dynamic_models(*source_ids: str):
+    """Forget the models of sources whose attributes changed"""
+    with _dynamic_models_lock:
+        for source_id in source_ids:
+            fingerprint = _source_fingerprints.pop(str(source_id), None)
+            if fingerprint is not None and fingerprint not in _source_fingerprints.values():
+                _dynamic_models.pop(fingerprint, None)
 
 
+def getHtmlFile(url: str, driver=None, throttle: bool = True, config: Optional[Dict] = None) -> tuple:
+    """Load a URL in a pooled browser and return the driver and page source.
 
-def getHtmlFile(url: str) -> tuple:
-    """Load a URL with undetected-chromedriver and return the driver and page source"""
+    When no driver is passed one is leased from the driver pool; the caller
+    must hand it back with ``driver_pool.release``. With a source config the
+    page is ready once its ``link_selector`` matches (see readiness.py).
+    """
+    leased = driver is None
+    started = None
     try:
-        options = uc.ChromeOptions()
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-       
-        # Khởi tạo undetected-chromedriver
-        driver = uc.Chrome(options=options)
-       
-        # Tải URL
+        if leased:
+            driver = driver_pool.acquire()
+        if throttle:
+            scheduler.acquire(url)
+
+        # Tải URL, bỏ qua ảnh/font/tracker theo profile của nguồn
+        apply_profile(driver, config)
+        started = time.monotonic()
         driver.get(url)
-       
-        # Chờ trang tải hoàn tất
-        WebDriverWait(driver, 30).until(
-            lambda d: d.execute_script('return document.readyState') == 'complete'
-        )
-       
+        scheduler.feedback(url, elapsed=time.monotonic() - started)
+        driver_pool.record_page(driver)
+
+        # Chờ tới khi danh sách link xuất hiện
+        readiness.wait(driver, config, (config or {}).get('link_selector'), listing=True)
+        record_fetch(source_label(config), STRATEGY_BROWSER, 'ok', time.monotonic() - started)
+
         page_source = driver.page_source
         return driver, page_source
-   
+
     except Exception as e:
         print(f"Error loading URL {url}: {e}")
+        if started is not None:
+            record_fetch(source_label(config), STRATEGY_BROWSER, 'error', time.monotonic() - started)
+        if leased:
+            driver_pool.release(driver)
         return None, None
 
 
+#this will return list of links
+_HARVEST_LINKS_JS = """
+const seen = new Set();
+const links = [];
+for (const el of document.querySelectorAll(arguments[0])) {
+    const anchor = el.closest('a[href]') || el.querySelector('a[href]');
+    // anchor.href is already resolved against the page URL
+    const url = anchor && anchor.href.startsWith('http') ? anchor.href.split('#')[0] : null;
+    if (url && !seen.has(url)) {
+        seen.add(url);
+        links.push(url);
+    }
+}
+return links;
+"""
 
 
+def getLinks(driver, className):
+    """Collect the absolute, de-duplicated hrefs of every match in one WebDriver call"""
+    links = driver.execute_script(_HARVEST_LINKS_JS, className) or []
+    print(len(links))
+    return links
 
 
+def extractObject(text: str, apikey, pydanticClass, source: Optional[str] = None) -> Dict:
+    """Ask Gemini to fill pydanticClass from the page text"""
+    resp = llm_client.complete(
+        messages=[
+            {
+                "role": "user",
+                "content": text}
+        ],
+        response_model=pydanticClass,
+        api_key=apikey,
+        source=source,
+    )
+    print(resp)
+    return modelToDict(resp)
 
 
-   
-def genPageLink(base_url: str, numberofpage: int = 3) -> List[str]:
-    """Generate paginated URLs using Gemini AI"""
-    try:
-        model = genai.GenerativeModel('models/gemini-1.5-flash-latest')
-        prompt = f"""
-        Generate a list of {numberofpage} paginated URLs for the base URL: {base_url}
-        These should be valid pagination URLs typically used by e-commerce or listing websites.
-        Return only the full URLs without any explanation, one URL per line.
-        """
-        response = model.generate_content(prompt)
-        urls = [url.strip() for url in response.text.split('\n') if url.strip()]
-        if not urls:
-            if '?' in base_url:
-                urls = [f"{base_url}&page={i+1}" for i in range(numberofpage)]
-            else:
-                urls = [f"{base_url}?page={i+1}" for i in range(numberofpage)]
-        print(f"Generated {len(urls)} paginated URLs")
-        return urls
-    except Exception as e:
-        print(f"Error generating paginated URLs: {e}")
-        if '?' in base_url:
-            return [f"{base_url}&page={i+1}" for i in range(numberofpage)]
-        else:
-            return [f"{base_url}?page={i+1}" for i in range(numberofpage)]
-
-
-#this will return list of links
-def getLinks(driver, className):
-    #sleep to wait for page to load
-    time.sleep(3)
-    elements=driver.find_elements(By.CSS_SELECTOR,className)
-    links = []
-    print(len(elements))
-    #get href of all elements
-    for element in elements:
-        #print(element.get_attribute("href"))
-        links.append(element.get_attribute("href"))
-    return links
-stop_event = threading.Event()
-def getObject(driver, link, apikey,pydanticClass,id):
-    while not stop_event.is_set():
-        try:
-            print(id)
-            start_time = time.time()
-            driver.set_page_load_timeout(15)
-            try:
-                driver.get(link)
-                #sleep to wait for page to load
-               
-               
-            except TimeoutException:
-                driver.execute_script("window.stop();")
-            html=driver.page_source
-            #get all image source as string
-            images = driver.find_elements(By.CSS_SELECTOR, "img")         
-            soup = BeautifulSoup(html, 'html.parser')
-            html = soup.get_text()
-           
-            for image in images:
-                if image.get_attribute("src") is not None:
-                    html += " "+image.get_attribute("src")
-           
-            # print(f"html: {html}")
-       
-            try:
-                genai.configure(api_key=apikey) # alternative API key configuration
-                client = instructor.from_gemini(
-                    client=genai.GenerativeModel(
-                        model_name="models/gemini-1.5-flash-latest",  
-                    ),
-                    mode=instructor.Mode.GEMINI_JSON,
-                )
-
-                resp = client.chat.completions.create(
-                   
-                    # max_tokens=1024,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": html}
-                    ],
-                    response_model=pydanticClass,
-                )
-                print(resp)
-                jsonObject=resp.dict()
-                #! Luu cai nay
-                print(jsonObject)
-                #convert any datetime object to string
-                for key in jsonObject:
-                    if isinstance(jsonObject[key], datetime.date):
-                        jsonObject[key]=jsonObject[key].strftime("%Y-%m-%d")
-                       
-                jsonObject['url']=link
-                add_web_page_content(id, link, jsonObject)
-            except Exception as e:
-                print("exception: ",e)
-                jsonObject= {
-                    "url": link,
-                    "name": "N/A",
-                    "price": "N/A",
-                    "area": "N/A",
-                    "legal": "N/A",
-                    "address": "N/A",
-                    "province": "N/A",
-                    "district": "N/A",
-                    "img": "N/A",}
-            return jsonObject
-        finally:
-            #driver.quit()
-            print("Got object")
+def modelToDict(resp: BaseModel) -> Dict:
+    """Dump an extracted model to a JSON-safe dict"""
+    jsonObject=resp.dict()
+    #convert any datetime object to string
+    for key in jsonObject:
+        if isinstance(jsonObject[key], date):
+            jsonObject[key]=jsonObject[key].strftime("%Y-%m-%d")
+    return jsonObject
 
 
 def genPageLink(url, numberofpage=5):
+    """Ask Gemini for paginated URLs; last resort of pagination.page_urls"""
     class Link(BaseModel):
         link: List[str]
-    genai.configure(api_key=os.getenv('API_KEY')) # alternative API key configuration
-    client = instructor.from_gemini(
-        client=genai.GenerativeModel(
-            model_name="models/gemini-1.5-flash-latest",  
-        ),
-        mode=instructor.Mode.GEMINI_JSON,
-    )
     prompt="be awared of trailing character,create links for "+url +" with page number from current page to  "+str(numberofpage)+"example: https://vnexpress.net/the-thao-p2 -> https://vnexpress.net/the-thao-p2, https://vnexpress.net/the-thao-p3, https://vnexpress.net/the-thao-p4, https://vnexpress.net/the-thao-p5"
-   
+
     #print(prompt)
 
 
-    resp=client.chat.completions.create(
-        # max_tokens=1024,
+    resp=llm_client.complete(
         messages=[
             {
                 "role": "user",
@@ -309,62 +250,9 @@ def genPageLink(url, numberofpage=5):
     return resp.link
 
 
-def add_web_page_content(source_id: str, url: str, content: Dict, ctx):
-    """Save the extracted content to the database"""
-    try:
-        result = Result(
-            source_id=uuid.UUID(source_id),
-            url=url,
-            contents=content,
-            time_stamp=datetime.now()
-        )
-        db.session.add(result)
-        db.session.commit()
-        print(f"Saved content from {url} to database")
-    except Exception as e:
-        db.session.rollback()
-        print(f"Error saving content to database: {e}")
-
-
-
-
-def crawlThread(urls: List[str], config: Dict, api_key: str, pydantic_model: BaseModel, source_id: str, ctx):
-    """Process a subset of URLs in a separate thread"""
-    try:
-        print(f"Starting crawler thread for {len(urls)} URLs")
-        ctx.push()  # Push context khi thread bắt đầu
-       
-        try:
-            for url in urls:
-                if stop_event.is_set():
-                    print("Stop event detected. Terminating thread.")
-                    break
-                   
-                try:
-                    driver, _ = getHtmlFile(url)
-                    if not driver:
-                        continue
-                   
-                    product_links = getLinks(driver, config['link_selector'])
-                    print(f"Found {len(product_links)} links using selector: {config['link_selector']}")
-                   
-                    for link in product_links:
-                        if stop_event.is_set():
-                            break
-                       
-                        try:
-                            getObject(driver, link, api_key, pydantic_model, source_id)
-                            time.sleep(3)  # Tăng delay giữa các request
-                        except Exception as e:
-                            print(f"Error processing product {link}: {e}")
-                   
-                    driver.quit()
-               
-                except Exception as e:
-                    print(f"Error processing URL {url}: {e}")
-       
-        finally:
-            ctx.pop()  # Ensure context is always popped
-   
-    except Exception as e:
-        print(f"Thread execution error: {e}")
+def add_web_page_content(source_id: str, url: str, content: Dict, ctx=None,
+                         etag: str = None, last_modified: str = None, content_hash: str = None,
+                         schema_fingerprint: str = None):
+    """Queue the extracted content and its re-fetch validators for the result writer"""
+    result_writer.start(current_app._get_current_object())
+    result_writer.put(source_id, url, content, etag, last_modified, content_hash, schema_fingerprint)
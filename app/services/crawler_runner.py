@@ -1,72 +1,54 @@
 #crawler_runner.py
-import os
 from typing import List, Dict
-import threading
 from app.services.crawler import (
     get_all_web_crawl,
-    get_web_crawl_attributes_by_web_crawl_id,
-    create_dynamic_model_from_json,
-    genPageLink,
-    crawlThread,
-    stop_event
+    get_dynamic_model,
 )
+from app.services.crawl_engine import CrawlEngine
+from app.services import llm_client
+from app.services.result_writer import result_writer
+from app.services.seen_index import SeenUrlIndex
+from app.config import Config
+from app.services.pagination import page_urls as generate_page_urls
 
-def run_crawler(web_id: str, app):
+def run_crawler(web_id: str, app, on_progress=None, incremental: bool = False, stop=None):
+    """Crawl the active sources; raises on failure so run_job can record the error"""
     try:
-        stop_event.clear()
-        api_key = os.getenv("GOOGLE_API_KEY")
-        print(f"API KEY: {api_key}")
-        if not api_key:
-            print("No GOOGLE_API_KEY found in environment variables")
-            return False
+        llm_client.require_keys()
         
         # Get web crawl sources
         with app.app_context():
-            sources = get_all_web_crawl()
-            if web_id:
-                sources = [s for s in sources if s['id'] == web_id]
+            # One query for the sources, one selectinload query for all their attributes
+            sources = get_all_web_crawl(web_id, with_attributes=True)
             
             if not sources:
-                print(f"No active web crawl sources found{' for ID ' + web_id if web_id else ''}")
-                return False
+                raise ValueError(f"No active web crawl sources found{' for ID ' + web_id if web_id else ''}")
             
-            # Process each source
+            # All sources share the engine's pipeline stages
+            # No fixed key: every LLM call takes one from llm_client.key_pool
+            engine = CrawlEngine(app, None, on_progress=on_progress, stop=stop)
             for source in sources:
                 print(f"Processing web crawl source: {source['url']}")
                 
-                attributes = get_web_crawl_attributes_by_web_crawl_id(source['id'])
+                attributes = source['attributes']
                 if not attributes:
                     print(f"No attributes defined for source {source['id']}")
                     continue
                 
-                pydantic_model = create_dynamic_model_from_json(attributes)
-                page_urls = genPageLink(source['url'], numberofpage=3)
-                num_threads = min(source['threads'], 3)
-                
-                # Split URLs among threads
-                url_chunks = [[] for _ in range(num_threads)]
-                for i, url in enumerate(page_urls):
-                    url_chunks[i % num_threads].append(url)
-                
-                # Create and start threads
-                threads = []
-                for i in range(num_threads):
-                    # Tạo một bản sao của app context cho mỗi thread
-                    ctx = app.app_context()
-                    thread = threading.Thread(
-                        target=crawlThread,
-                        args=(url_chunks[i], source, api_key, pydantic_model, source['id'], ctx)
-                    )
-                    thread.start()
-                    threads.append(thread)
-                
-                for thread in threads:
-                    thread.join()
-                
-                print(f"Completed processing source: {source['url']}")
+                pydantic_model = get_dynamic_model(source['id'], attributes)
+                page_urls = generate_page_urls(source, numberofpage=3)
+                # Incremental runs skip links stored within the freshness window
+                seen = SeenUrlIndex(source['id'], Config.CRAWL_FRESHNESS_HOURS if incremental else None).load()
+                engine.add_source(source, pydantic_model, page_urls, seen)
             
-            return True
+        try:
+            stats = engine.run_sync()
+        finally:
+            # Rows of this job must be in the DB before it is reported finished
+            result_writer.flush()
+        print(f"Completed crawl: {stats}")
+        return True
     
     except Exception as e:
         print(f"Error in run_crawler: {e}")
-        return False
\ No newline at end of file
+        raise
@@ -0,0 +1,211 @@
+#driver_pool.py
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import undetected_chromedriver as uc
+
+try:
+    import psutil
+except ImportError:  # The memory trigger is skipped; the page-count limit still applies
+    psutil = None
+
+from app.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+
+class PooledDriver:
+    """A Chrome instance owned by the pool plus its bookkeeping"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.time()
+        self.pages = 0
+        self.baseline_rss_mb = None
+        self.retired = False
+
+
+class DriverPool:
+    """Bounded pool of warm undetected-chromedriver instances shared by crawler threads"""
+
+    def __init__(self, max_size: int, max_pages: int, max_memory_mb: int, lease_timeout: float):
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.lease_timeout = lease_timeout
+        self._idle: List[PooledDriver] = []
+        self._leased: Dict[int, PooledDriver] = {}
+        self._cond = threading.Condition()
+        # uc.Chrome patches the chromedriver binary on start, concurrent launches race on it
+        self._launch_lock = threading.Lock()
+        self.created = 0
+        self.recycled = 0
+
+    def _launch(self) -> PooledDriver:
+        options = uc.ChromeOptions()
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        # driver.get returns at DOMContentLoaded; readiness.py decides when the page is usable
+        options.page_load_strategy = 'eager'
+        with self._launch_lock:
+            driver = uc.Chrome(options=options)
+        self.created += 1
+        pooled = PooledDriver(driver)
+        # Growth is measured against the freshly launched browser
+        pooled.baseline_rss_mb = self._rss_mb(pooled)
+        return pooled
+
+    def _quit(self, pooled: PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting driver: {e}")
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        try:
+            pooled.driver.execute_script('return 1')
+            return True
+        except Exception:
+            return False
+
+    def _rss_mb(self, pooled: PooledDriver) -> Optional[float]:
+        """Resident memory of the Chrome browser process and all its children (renderers, GPU)"""
+        pid = getattr(pooled.driver, 'browser_pid', None)
+        if psutil is None or not pid:
+            return None
+        try:
+            browser = psutil.Process(pid)
+            processes = [browser] + browser.children(recursive=True)
+        except psutil.Error:
+            return None
+        rss = 0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+            except psutil.Error:
+                # A renderer may exit between listing and reading it
+                continue
+        return rss / (1024 * 1024)
+
+    def _should_recycle(self, pooled: PooledDriver) -> bool:
+        if pooled.retired:
+            return True
+        if self.max_pages and pooled.pages >= self.max_pages:
+            return True
+        if self.max_memory_mb and pooled.baseline_rss_mb is not None:
+            rss = self._rss_mb(pooled)
+            if rss is not None and rss - pooled.baseline_rss_mb > self.max_memory_mb:
+                return True
+        return False
+
+    def acquire(self):
+        """Lease a driver, launching a new one while the pool is below max_size"""
+        deadline = time.time() + self.lease_timeout
+        while True:
+            pooled = None
+            with self._cond:
+                while True:
+                    if self._idle:
+                        # Booked as leased so the slot stays taken while it is checked
+                        pooled = self._idle.pop()
+                        self._leased[id(pooled.driver)] = pooled
+                        break
+                    if len(self._leased) < self.max_size:
+                        # Reserve the slot before releasing the lock to launch
+                        placeholder = object()
+                        self._leased[id(placeholder)] = None
+                        break
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a browser from the driver pool")
+                    self._cond.wait(remaining)
+
+            if pooled is None:
+                break
+            # WebDriver round trips happen outside the lock: a hung Chrome must not
+            # stall release, record_page or stats (and so /metrics)
+            if self._is_healthy(pooled):
+                return pooled.driver
+            with self._cond:
+                self._leased.pop(id(pooled.driver), None)
+                self.recycled += 1
+                self._cond.notify()
+            self._quit(pooled)
+
+        try:
+            pooled = self._launch()
+        except Exception:
+            with self._cond:
+                self._leased.pop(id(placeholder), None)
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._leased.pop(id(placeholder), None)
+            self._leased[id(pooled.driver)] = pooled
+        return pooled.driver
+
+    def release(self, driver):
+        """Return a leased driver, recycling it when it is worn out or unhealthy"""
+        if driver is None:
+            return
+        with self._cond:
+            pooled = self._leased.pop(id(driver), None)
+            self._cond.notify()
+        if pooled is None:
+            return
+        if self._should_recycle(pooled) or not self._is_healthy(pooled):
+            self.recycled += 1
+            self._quit(pooled)
+            return
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    def record_page(self, driver):
+        """Count a page load against the driver's recycle budget"""
+        with self._cond:
+            pooled = self._leased.get(id(driver))
+            if pooled is not None:
+                pooled.pages += 1
+
+    @contextmanager
+    def lease(self):
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def shutdown(self):
+        """Quit idle drivers and retire leased ones so they are quit on release"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            for pooled in self._leased.values():
+                if pooled is not None:
+                    pooled.retired = True
+            self._cond.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+        logger.info(f"Driver pool shut down, quit {len(idle)} idle drivers")
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'idle': len(self._idle),
+                'leased': len(self._leased),
+                'max_size': self.max_size,
+                'created': self.created,
+                'recycled': self.recycled,
+            }
+
+
+driver_pool = DriverPool(
+    max_size=Config.DRIVER_POOL_SIZE,
+    max_pages=Config.DRIVER_MAX_PAGES,
+    max_memory_mb=Config.DRIVER_MAX_MEMORY_MB,
+    lease_timeout=Config.DRIVER_LEASE_TIMEOUT,
+)
@@ -0,0 +1,123 @@
+#exporter.py
+import csv
+import importlib.util
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import select
+
+from app import db
+from app.config import Config
+from app.models.attributes import Attribute
+from app.models.results import Result
+
+
+FORMATS = ('ndjson', 'csv', 'parquet')
+PYARROW_MISSING = "Parquet export needs pyarrow: pip install pyarrow"
+BASE_COLUMNS = ['id', 'source_id', 'url', 'time_stamp']
+
+
+def export_columns(source_id: str) -> List[str]:
+    """Fixed columns followed by the source's attribute names, alphabetically"""
+    names = [
+        name for (name,) in db.session.query(Attribute.name)
+        .filter(Attribute.source_id == uuid.UUID(source_id))
+        .order_by(Attribute.name)
+    ]
+    return BASE_COLUMNS + [name for name in dict.fromkeys(names) if name not in BASE_COLUMNS]
+
+
+def iter_results(source_id: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                 batch_size: int = None) -> Iterator[Result]:
+    """Stream a source's results through a server-side cursor, batch_size rows at a time"""
+    stmt = select(Result).where(Result.source_id == uuid.UUID(source_id))
+    if since is not None:
+        stmt = stmt.where(Result.time_stamp >= since)
+    if until is not None:
+        stmt = stmt.where(Result.time_stamp < until)
+    stmt = stmt.order_by(Result.time_stamp, Result.id).execution_options(
+        yield_per=batch_size or Config.EXPORT_BATCH_SIZE
+    )
+    for result in db.session.execute(stmt).scalars():
+        yield result
+        # Rows are not needed once written; keep the identity map from growing
+        db.session.expunge(result)
+
+
+def flatten(result: Result) -> Dict:
+    """One flat record per result: metadata plus every contents field"""
+    record = dict(result.contents or {})
+    record.update({
+        'id': str(result.id),
+        'source_id': str(result.source_id),
+        'url': result.url,
+        'time_stamp': result.time_stamp.isoformat(),
+    })
+    return record
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def to_ndjson(results: Iterator[Result]) -> Iterator[str]:
+    for result in results:
+        yield json.dumps(flatten(result), ensure_ascii=False) + '\n'
+
+
+def to_csv(results: Iterator[Result], columns: List[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for result in results:
+        record = flatten(result)
+        writer.writerow([_cell(record.get(column)) for column in columns])
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def require_pyarrow():
+    """Fail before any rows are read when the Parquet writer cannot be loaded"""
+    if importlib.util.find_spec('pyarrow') is None:
+        raise RuntimeError(PYARROW_MISSING)
+
+
+def write_parquet(results: Iterator[Result], columns: List[str], path: str, batch_size: int = None) -> int:
+    """Write results to a Parquet file one row group per batch; returns the row count"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError(PYARROW_MISSING)
+
+    batch_size = batch_size or Config.EXPORT_BATCH_SIZE
+    # Extracted values are free-form; keep every attribute as text like the CSV export
+    schema = pa.schema(
+        [pa.field(column, pa.timestamp('us') if column == 'time_stamp' else pa.string()) for column in columns]
+    )
+    rows, written = [], 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for result in results:
+            record = flatten(result)
+            row = {column: (None if record.get(column) is None else str(_cell(record.get(column))))
+                   for column in columns}
+            row['time_stamp'] = result.time_stamp
+            rows.append(row)
+            if len(rows) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                written += len(rows)
+                rows = []
+        if rows:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            written += len(rows)
+    return written
@@ -0,0 +1,170 @@
+#extraction_cache.py
+import hashlib
+import json
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.config import Config
+from app.models.extraction_cache import ExtractionCache
+
+
+logger = logging.getLogger(__name__)
+
+_whitespace = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so layout-only changes do not miss the cache"""
+    return _whitespace.sub(' ', text).strip()
+
+
+def content_hash(text: str) -> str:
+    """Hash of the normalized prompt text, stored per result to detect unchanged pages"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def schema_fingerprint(pydanticClass: BaseModel) -> str:
+    """Hash of the model's JSON schema, i.e. of the attribute names and types"""
+    schema = json.dumps(pydanticClass.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode('utf-8')).hexdigest()
+
+
+def cache_key(text: str, fingerprint: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(fingerprint.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalize_text(text).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ExtractionResultCache:
+    """Persistent content-addressed cache of LLM extractions with TTL and size bound"""
+
+    def __init__(self, ttl_hours: float, max_entries: int, evict_every: int = 100):
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self._lock = threading.Lock()
+        self._puts_since_evict = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def get(self, text: str, pydanticClass: BaseModel) -> Optional[Dict]:
+        """Return a cached extraction for this text and schema, or None"""
+        if not Config.EXTRACTION_CACHE_ENABLED:
+            return None
+        key = cache_key(text, schema_fingerprint(pydanticClass))
+        try:
+            entry = db.session.get(ExtractionCache, key)
+            if entry is None:
+                self._count('misses')
+                return None
+            now = datetime.now()
+            if now - entry.created_at > self.ttl:
+                db.session.delete(entry)
+                db.session.commit()
+                self._count('expired')
+                self._count('misses')
+                return None
+            entry.hits += 1
+            entry.last_used_at = now
+            contents = dict(entry.contents)
+            db.session.commit()
+            self._count('hits')
+            return contents
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Extraction cache lookup failed: {e}")
+            self._count('misses')
+            return None
+
+    def put(self, text: str, pydanticClass: BaseModel, contents: Dict):
+        """Store an extraction, refreshing the entry when the key already exists"""
+        if not Config.EXTRACTION_CACHE_ENABLED:
+            return
+        fingerprint = schema_fingerprint(pydanticClass)
+        now = datetime.now()
+        stmt = insert(ExtractionCache).values(
+            key=cache_key(text, fingerprint),
+            schema_fingerprint=fingerprint,
+            contents=contents,
+            hits=0,
+            created_at=now,
+            last_used_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ExtractionCache.key],
+            set_={'contents': stmt.excluded.contents, 'created_at': now, 'last_used_at': now},
+        )
+        try:
+            db.session.execute(stmt)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Extraction cache store failed: {e}")
+            return
+
+        with self._lock:
+            self._puts_since_evict += 1
+            due = self._puts_since_evict >= self.evict_every
+            if due:
+                self._puts_since_evict = 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used ones above max_entries"""
+        try:
+            expired = ExtractionCache.query.filter(
+                ExtractionCache.created_at < datetime.now() - self.ttl
+            ).delete(synchronize_session=False)
+            overflow = ExtractionCache.query.count() - self.max_entries
+            evicted = 0
+            if overflow > 0:
+                oldest = (
+                    db.session.query(ExtractionCache.key)
+                    .order_by(ExtractionCache.last_used_at.asc())
+                    .limit(overflow)
+                    .subquery()
+                )
+                evicted = ExtractionCache.query.filter(
+                    ExtractionCache.key.in_(db.select(oldest.c.key))
+                ).delete(synchronize_session=False)
+            db.session.commit()
+            self._count('expired', expired)
+            self._count('evicted', evicted)
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Extraction cache eviction failed: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'expired': self.expired,
+                'evicted': self.evicted,
+            }
+
+
+extraction_cache = ExtractionResultCache(
+    ttl_hours=Config.EXTRACTION_CACHE_TTL_HOURS,
+    max_entries=Config.EXTRACTION_CACHE_MAX_ENTRIES,
+)
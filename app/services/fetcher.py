@@ -0,0 +1,202 @@
+#fetcher.py
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import TimeoutException
+
+from app import db
+from app.config import Config
+from app.models.sources import Source
+from app.services.driver_pool import driver_pool
+from app.services.html_parser import parse, safe_select
+from app.services.metrics import record_fetch, source_label
+from app.services.politeness import scheduler
+from app.services.readiness import readiness
+from app.services.resource_blocking import apply_profile
+
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_HTTP = 'http'
+STRATEGY_BROWSER = 'browser'
+
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/124.0 Safari/537.36'
+    ),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'vi-VN,vi;q=0.9,en-US;q=0.8,en;q=0.7',
+}
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=Config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+        max_retries=1,
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+# requests.Session is safe to share for plain GETs; the adapter keeps per-host keep-alive pools
+http_session = _build_session()
+
+_strategies: Dict[str, str] = {}
+_strategies_lock = threading.Lock()
+
+
+@dataclass
+class FetchedPage:
+    html: Optional[str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+
+def _conditional_headers(validators: Optional[Dict]) -> Dict:
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+
+def fetch_http_page(url: str, validators: Optional[Dict] = None, throttle: bool = True,
+                    source: Optional[str] = None) -> Optional[FetchedPage]:
+    """GET a page over plain HTTP, conditionally when validators are known"""
+    validators = validators or {}
+    if throttle:
+        scheduler.acquire(url)
+    started = time.monotonic()
+    try:
+        response = http_session.get(url, timeout=Config.HTTP_TIMEOUT, headers=_conditional_headers(validators))
+    except requests.RequestException as e:
+        elapsed = time.monotonic() - started
+        scheduler.feedback(url, elapsed=elapsed)
+        record_fetch(source, STRATEGY_HTTP, 'error', elapsed)
+        logger.info(f"HTTP fetch failed for {url}: {e}")
+        return None
+    elapsed = time.monotonic() - started
+    scheduler.feedback(url, response.status_code, elapsed, response.headers.get('Retry-After'))
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if response.status_code == 304:
+        record_fetch(source, STRATEGY_HTTP, 'not_modified', elapsed)
+        return FetchedPage(None, etag or validators.get('etag'), last_modified or validators.get('last_modified'), True)
+    if response.status_code != 200 or 'html' not in response.headers.get('Content-Type', 'text/html'):
+        record_fetch(source, STRATEGY_HTTP, 'rejected', elapsed)
+        return None
+    record_fetch(source, STRATEGY_HTTP, 'ok', elapsed)
+    return FetchedPage(response.text, etag, last_modified)
+
+
+def fetch_http(url: str) -> Optional[str]:
+    """GET a page over plain HTTP, returning None on errors or non-HTML responses"""
+    page = fetch_http_page(url)
+    return page.html if page is not None else None
+
+
+def fetch_browser(url: str, driver=None, throttle: bool = True, config: Optional[Dict] = None) -> Optional[str]:
+    """Render a page in Chrome, leasing a pooled driver when none is given"""
+    if driver is None:
+        with driver_pool.lease() as pooled_driver:
+            return fetch_browser(url, pooled_driver, throttle, config)
+    if throttle:
+        scheduler.acquire(url)
+    apply_profile(driver, config)
+    driver.set_page_load_timeout(15)
+    started = time.monotonic()
+    outcome = 'ok'
+    try:
+        driver.get(url)
+    except TimeoutException:
+        outcome = 'timeout'
+        driver.execute_script("window.stop();")
+    scheduler.feedback(url, elapsed=time.monotonic() - started)
+    driver_pool.record_page(driver)
+    readiness.wait(driver, config, (config or {}).get('card_information'))
+    record_fetch(source_label(config), STRATEGY_BROWSER, outcome, time.monotonic() - started)
+    return driver.page_source
+
+
+def has_content(html: str, config: Dict) -> bool:
+    """Check whether server-rendered HTML already carries the data we extract"""
+    page = parse(html)
+    selector = (config or {}).get('card_information')
+    if selector and safe_select(page, selector):
+        return True
+    return len(page.text()) >= Config.HTTP_MIN_TEXT_CHARS
+
+
+def get_strategy(config: Dict) -> Optional[str]:
+    """The source's saved strategy when it has one, else what this process learned"""
+    source_id = config['id']
+    with _strategies_lock:
+        if config.get('fetch_strategy'):
+            _strategies[source_id] = config['fetch_strategy']
+        return _strategies.get(source_id)
+
+
+def forget_strategy(source_id: str):
+    """Drop the in-memory strategy of a source whose URL or strategy was edited"""
+    with _strategies_lock:
+        _strategies.pop(source_id, None)
+
+
+def remember_strategy(config: Dict, strategy: str):
+    """Record the winning strategy in memory and on the Source row"""
+    source_id = config['id']
+    with _strategies_lock:
+        if _strategies.get(source_id) == strategy:
+            return
+        _strategies[source_id] = strategy
+    try:
+        Source.query.filter_by(id=uuid.UUID(source_id)).update({'fetch_strategy': strategy})
+        db.session.commit()
+        print(f"Fetch strategy for source {source_id}: {strategy}")
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"Could not persist fetch strategy for source {source_id}: {e}")
+
+
+def fetch_detail(url: str, config: Optional[Dict], driver=None, validators: Optional[Dict] = None,
+                 throttle: bool = True) -> FetchedPage:
+    """Fetch a detail page over HTTP when the source allows it, else through Chrome.
+
+    With validators from the previous crawl the HTTP request is conditional and a
+    304 comes back as ``not_modified`` without a body. Pass ``throttle=False`` when
+    the caller already reserved a politeness slot for the URL.
+    """
+    if not config:
+        return FetchedPage(fetch_browser(url, driver, throttle, config))
+
+    strategy = get_strategy(config)
+    if strategy != STRATEGY_BROWSER:
+        page = fetch_http_page(url, validators, throttle, source_label(config))
+        if page is not None and page.not_modified:
+            return page
+        if page is not None and has_content(page.html, config):
+            if strategy is None:
+                remember_strategy(config, STRATEGY_HTTP)
+            return page
+        # Only a 200 HTML page without the data proves the source needs rendering;
+        # timeouts, 429s and 5xx leave the strategy undecided. A source that already
+        # proved itself over HTTP keeps that strategy, only this page uses the browser
+        if page is not None and strategy is None:
+            remember_strategy(config, STRATEGY_BROWSER)
+        # The HTTP attempt already used this URL's slot
+        throttle = False
+    return FetchedPage(fetch_browser(url, driver, throttle, config))
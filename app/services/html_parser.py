@@ -0,0 +1,104 @@
+#html_parser.py
+import importlib.util
+import logging
+from functools import lru_cache
+from typing import List, Optional
+
+from bs4 import BeautifulSoup, Tag
+
+from app.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+BACKEND_SELECTOLAX = 'selectolax'
+BACKEND_LXML = 'lxml'
+BACKEND_HTML_PARSER = 'html.parser'
+
+# Fastest first
+BACKENDS = (BACKEND_SELECTOLAX, BACKEND_LXML, BACKEND_HTML_PARSER)
+
+
+def _installed(backend: str) -> bool:
+    if backend == BACKEND_HTML_PARSER:
+        return True
+    return importlib.util.find_spec(backend) is not None
+
+
+def available_backends() -> List[str]:
+    return [backend for backend in BACKENDS if _installed(backend)]
+
+
+@lru_cache(maxsize=None)
+def best_backend() -> str:
+    """HTML_PARSER when set and installed, otherwise the fastest installed backend"""
+    wanted = Config.HTML_PARSER
+    if wanted and wanted != 'auto':
+        if wanted in BACKENDS and _installed(wanted):
+            return wanted
+        logger.warning(f"HTML parser {wanted!r} is not available, picking the fastest installed one")
+    return available_backends()[0]
+
+
+@lru_cache(maxsize=None)
+def soup_features() -> str:
+    """bs4 tree builder for code that needs a mutable BeautifulSoup tree"""
+    return BACKEND_LXML if _installed(BACKEND_LXML) and best_backend() != BACKEND_HTML_PARSER else BACKEND_HTML_PARSER
+
+
+def make_soup(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, soup_features())
+
+
+class ParsedHtml:
+    """Read-only view of a page: text and selector checks, on whichever backend is fastest"""
+
+    def __init__(self, html: str, backend: Optional[str] = None):
+        self.backend = backend or best_backend()
+        if self.backend == BACKEND_SELECTOLAX:
+            from selectolax.parser import HTMLParser
+            self._tree = HTMLParser(html)
+        else:
+            self._tree = BeautifulSoup(html, self.backend)
+
+    def text(self, separator: str = " ") -> str:
+        if self.backend == BACKEND_SELECTOLAX:
+            return self._tree.text(separator=separator, strip=True)
+        return self._tree.get_text(separator, strip=True)
+
+    def has(self, selector: str) -> bool:
+        """Whether the CSS selector matches; raises on selectors the backend cannot parse"""
+        if self.backend == BACKEND_SELECTOLAX:
+            return self._tree.css_first(selector) is not None
+        return self._tree.select_one(selector) is not None
+
+    def select(self, selector: str) -> list:
+        """Every node the CSS selector matches; raises on selectors the backend cannot parse"""
+        if self.backend == BACKEND_SELECTOLAX:
+            return self._tree.css(selector)
+        return self._tree.select(selector)
+
+
+def parse(html: str, backend: Optional[str] = None) -> ParsedHtml:
+    return ParsedHtml(html, backend)
+
+
+def safe_select(target, selector: str) -> Optional[list]:
+    """Matches of a CSS selector in a soup, a ParsedHtml or a live WebDriver.
+
+    Returns None when the selector cannot be parsed: card_information is free
+    text on some sources, not a CSS selector.
+    """
+    # Checked by type: a soup answers any attribute lookup with a child-tag search
+    if not isinstance(target, (Tag, ParsedHtml)):
+        # Imported here so reducer worker processes never load Selenium
+        from selenium.common.exceptions import InvalidSelectorException
+        from selenium.webdriver.common.by import By
+        try:
+            return target.find_elements(By.CSS_SELECTOR, selector)
+        except InvalidSelectorException:
+            return None
+    try:
+        return target.select(selector)
+    except Exception:
+        return None
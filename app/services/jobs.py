@@ -0,0 +1,141 @@
+#jobs.py
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+from app import db
+from app.models.jobs import CrawlJob
+from app.services import work_queue
+from app.services.crawler import get_all_web_crawl
+from app.services.crawler_runner import run_crawler
+from app.services.pagination import page_urls as generate_page_urls
+
+
+# Stop flags of the in-process jobs still running, by job id
+_stop_flags: Dict[str, threading.Event] = {}
+_stop_flags_lock = threading.Lock()
+
+
+def create_job(web_id: Optional[str], incremental: bool = False, distributed: bool = False) -> CrawlJob:
+    """Insert a PENDING crawl job"""
+    job = CrawlJob(web_id=uuid.UUID(web_id) if web_id else None, incremental=incremental, distributed=distributed)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def update_job(job_id: str, **fields):
+    """Write counters/state onto a job row from any thread with an app context"""
+    try:
+        CrawlJob.query.filter_by(id=uuid.UUID(job_id)).update(fields)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error updating crawl job {job_id}: {e}")
+
+
+def run_job(job_id: str, web_id: Optional[str], app, incremental: bool = False,
+            stop: Optional[threading.Event] = None):
+    """Run one crawl job to completion, recording its lifecycle on the job row"""
+    stop = stop or threading.Event()
+    with app.app_context():
+        update_job(job_id, state='RUNNING', started_at=datetime.now())
+
+    def on_progress(stats: Dict, source_stats: Dict):
+        update_job(
+            job_id,
+            listings=stats['listings'],
+            links_found=stats['links_found'],
+            saved=stats['saved'],
+            failed=stats['failed'],
+            unchanged=stats['unchanged'],
+            # Stage queue depths sit next to the per-source progress for tuning
+            progress=dict(source_stats, pipeline=stats.get('pipeline', {})),
+        )
+
+    error = None
+    try:
+        success = run_crawler(web_id, app, on_progress=on_progress, incremental=incremental, stop=stop)
+    except Exception as e:
+        success, error = False, str(e)[:500]
+    finally:
+        with _stop_flags_lock:
+            _stop_flags.pop(job_id, None)
+
+    if stop.is_set():
+        state = 'STOPPED'
+    else:
+        state = 'COMPLETED' if success else 'FAILED'
+    with app.app_context():
+        update_job(job_id, state=state, error=error, finished_at=datetime.now())
+
+
+def start_job(web_id: Optional[str], app, incremental: bool = False) -> CrawlJob:
+    """Create a job and crawl it on a background thread so the request returns at once"""
+    job = create_job(web_id, incremental)
+    stop = threading.Event()
+    with _stop_flags_lock:
+        _stop_flags[str(job.id)] = stop
+    thread = threading.Thread(
+        target=run_job,
+        args=(str(job.id), web_id, app, incremental, stop),
+        name=f"crawl-job-{job.id}",
+        daemon=True,
+    )
+    thread.start()
+    return job
+
+
+def stop_job(job_id: str) -> bool:
+    """Ask one in-process job to stop; False when it is not running here"""
+    with _stop_flags_lock:
+        stop = _stop_flags.get(job_id)
+    if stop is None:
+        return False
+    stop.set()
+    return True
+
+
+def stop_running_jobs() -> int:
+    """Ask every in-process job to stop and return how many were running"""
+    with _stop_flags_lock:
+        flags = list(_stop_flags.values())
+    for stop in flags:
+        stop.set()
+    return len(flags)
+
+
+def seed_distributed_job(job_id: str, web_id: Optional[str], app):
+    """Queue the listing pages of every source for worker.py processes to pick up"""
+    with app.app_context():
+        try:
+            sources = get_all_web_crawl(web_id, with_attributes=True)
+            queued = 0
+            for source in sources:
+                if not source['attributes']:
+                    print(f"No attributes defined for source {source['id']}")
+                    continue
+                urls = generate_page_urls(source, numberofpage=3)
+                queued += work_queue.enqueue(job_id, source['id'], 'listing', urls)
+        except Exception as e:
+            update_job(job_id, state='FAILED', error=str(e)[:500], finished_at=datetime.now())
+            return
+        if not queued:
+            update_job(job_id, state='FAILED', error='No active sources with attributes', finished_at=datetime.now())
+            return
+        update_job(job_id, state='RUNNING', started_at=datetime.now())
+        print(f"Queued {queued} listing pages for distributed job {job_id}")
+
+
+def start_distributed_job(web_id: Optional[str], app, incremental: bool = False) -> CrawlJob:
+    """Create a job whose work is done by worker.py processes through the crawl_tasks table"""
+    job = create_job(web_id, incremental, distributed=True)
+    thread = threading.Thread(
+        target=seed_distributed_job,
+        args=(str(job.id), web_id, app),
+        name=f"seed-job-{job.id}",
+        daemon=True,
+    )
+    thread.start()
+    return job
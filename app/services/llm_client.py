@@ -0,0 +1,165 @@
+#llm_client.py
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import google.ai.generativelanguage as glm
+import google.generativeai as genai
+import instructor
+from google.api_core.exceptions import ResourceExhausted, TooManyRequests
+from pydantic import BaseModel
+
+from app.config import Config
+from app.services.metrics import LLM_SECONDS, UNKNOWN_SOURCE, record_llm_usage
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "models/gemini-1.5-flash-latest"
+
+_clients: Dict[tuple, instructor.Instructor] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key: str, model_name: str = DEFAULT_MODEL):
+    """Return the shared instructor client for this key and model, building it once"""
+    cache_key = (api_key, model_name)
+    with _clients_lock:
+        client = _clients.get(cache_key)
+        if client is None:
+            model = genai.GenerativeModel(model_name=model_name)
+            # genai.configure is process-wide; give each model its own transport so
+            # several keys can be used at once. The gRPC client is thread-safe.
+            model._client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+            client = instructor.from_gemini(client=model, mode=instructor.Mode.GEMINI_JSON)
+            _clients[cache_key] = client
+        return client
+
+
+class KeyState:
+    def __init__(self, key: str):
+        self.key = key
+        self.calls = deque()
+        self.cooldown_until = 0.0
+        self.rate_limited = 0
+        self.total = 0
+
+
+class ApiKeyPool:
+    """Spreads LLM calls across API keys with a per-key requests-per-minute budget"""
+
+    def __init__(self, keys: List[str], rpm: int, cooldown: float):
+        self.rpm = rpm
+        self.cooldown = cooldown
+        self._keys: Dict[str, KeyState] = {}
+        self._lock = threading.Lock()
+        for key in keys:
+            self.add(key)
+
+    def add(self, key: str):
+        with self._lock:
+            if key and key not in self._keys:
+                self._keys[key] = KeyState(key)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _available_at(self, state: KeyState, now: float) -> float:
+        while state.calls and now - state.calls[0] >= 60:
+            state.calls.popleft()
+        ready = state.cooldown_until
+        if self.rpm and len(state.calls) >= self.rpm:
+            ready = max(ready, state.calls[0] + 60)
+        return ready
+
+    def acquire(self) -> str:
+        """Block until some key has budget left and return the least used one"""
+        while True:
+            with self._lock:
+                if not self._keys:
+                    raise ValueError("No Gemini API key configured")
+                now = time.time()
+                # Earliest available first, then the key with the fewest recent calls
+                ready, best = min(
+                    ((max(self._available_at(state, now), now), state) for state in self._keys.values()),
+                    key=lambda candidate: (candidate[0], len(candidate[1].calls)),
+                )
+                if ready <= now:
+                    best.calls.append(now)
+                    best.total += 1
+                    return best.key
+                wait = ready - now
+            time.sleep(min(wait, 5))
+
+    def report_rate_limited(self, key: str):
+        with self._lock:
+            state = self._keys.get(key)
+            if state:
+                state.rate_limited += 1
+                state.cooldown_until = time.time() + self.cooldown
+        logger.warning(f"Gemini key ...{key[-4:]} rate limited, cooling down {self.cooldown}s")
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            now = time.time()
+            return [
+                {
+                    'key': f"...{state.key[-4:]}",
+                    'calls_last_minute': len(state.calls),
+                    'total': state.total,
+                    'rate_limited': state.rate_limited,
+                    'cooling_down': state.cooldown_until > now,
+                }
+                for state in self._keys.values()
+            ]
+
+
+key_pool = ApiKeyPool(Config.GOOGLE_API_KEYS, rpm=Config.LLM_KEY_RPM, cooldown=Config.LLM_KEY_COOLDOWN)
+
+
+def require_keys():
+    """Fail fast before a crawl when neither GOOGLE_API_KEYS nor GOOGLE_API_KEY is set"""
+    if not len(key_pool):
+        raise ValueError("No Gemini API key configured: set GOOGLE_API_KEYS or GOOGLE_API_KEY")
+
+
+def _is_rate_limit(e: Exception) -> bool:
+    if isinstance(e, (ResourceExhausted, TooManyRequests)):
+        return True
+    cause = e.__cause__ or e.__context__
+    return cause is not None and isinstance(cause, (ResourceExhausted, TooManyRequests))
+
+
+def complete(messages: List[Dict], response_model: BaseModel, api_key: Optional[str] = None,
+             model_name: str = DEFAULT_MODEL, source: Optional[str] = None):
+    """Run one structured completion on the least loaded key, rotating on 429s.
+
+    ``source`` only labels the latency and token metrics.
+    """
+    if api_key:
+        key_pool.add(api_key)
+    attempts = max(len(key_pool), 1)
+    for attempt in range(attempts):
+        key = key_pool.acquire()
+        started = time.monotonic()
+        try:
+            resp, completion = get_client(key, model_name).chat.completions.create_with_completion(
+                messages=messages,
+                response_model=response_model,
+            )
+        except Exception as e:
+            rate_limited = _is_rate_limit(e)
+            LLM_SECONDS.labels(source or UNKNOWN_SOURCE, 'rate_limited' if rate_limited else 'error').observe(
+                time.monotonic() - started
+            )
+            if not rate_limited:
+                raise
+            key_pool.report_rate_limited(key)
+            if attempt == attempts - 1:
+                raise
+            continue
+        LLM_SECONDS.labels(source or UNKNOWN_SOURCE, 'ok').observe(time.monotonic() - started)
+        record_llm_usage(source, completion)
+        return resp
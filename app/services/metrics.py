@@ -0,0 +1,91 @@
+#metrics.py
+from typing import Dict, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+from app.services.driver_pool import driver_pool
+
+
+UNKNOWN_SOURCE = 'unknown'
+
+PAGES_FETCHED = Counter(
+    'crawler_pages_fetched_total', 'Pages fetched, by fetch mode and outcome',
+    ['source', 'mode', 'outcome'],
+)
+FETCH_SECONDS = Histogram(
+    'crawler_fetch_seconds', 'Time to fetch one page, including the readiness wait in the browser',
+    ['source', 'mode'],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+READY_SECONDS = Histogram(
+    'crawler_ready_seconds', 'Time from DOMContentLoaded until a browser page is ready',
+    ['source', 'strategy'],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30),
+)
+LINKS_PER_LISTING = Histogram(
+    'crawler_links_per_listing', 'Product links found on one listing page',
+    ['source'],
+    buckets=(0, 1, 5, 10, 20, 50, 100, 200, 500),
+)
+LLM_SECONDS = Histogram(
+    'crawler_llm_request_seconds', 'Duration of one structured LLM completion',
+    ['source', 'outcome'],
+    buckets=(0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+LLM_TOKENS = Counter(
+    'crawler_llm_tokens_total', 'LLM tokens used, prompt or completion',
+    ['source', 'kind'],
+)
+EXTRACTION_FAILURES = Counter(
+    'crawler_extraction_failures_total', 'Pages whose extraction failed after every retry',
+    ['source'],
+)
+DB_WRITE_SECONDS = Histogram(
+    'crawler_db_write_seconds', 'Duration of one result writer flush (a flush mixes sources)',
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+ROWS_WRITTEN = Counter(
+    'crawler_result_rows_total', 'Result rows flushed to the database, written or failed',
+    ['source', 'outcome'],
+)
+
+
+def source_label(config: Optional[Dict]) -> str:
+    """Source id of a crawl config, for the source label"""
+    return (config or {}).get('id') or UNKNOWN_SOURCE
+
+
+def record_fetch(source: Optional[str], mode: str, outcome: str, seconds: float):
+    PAGES_FETCHED.labels(source or UNKNOWN_SOURCE, mode, outcome).inc()
+    FETCH_SECONDS.labels(source or UNKNOWN_SOURCE, mode).observe(seconds)
+
+
+def record_llm_usage(source: Optional[str], completion):
+    """Count the tokens reported in a Gemini response's usage_metadata"""
+    usage = getattr(completion, 'usage_metadata', None)
+    if usage is None:
+        return
+    source = source or UNKNOWN_SOURCE
+    LLM_TOKENS.labels(source, 'prompt').inc(getattr(usage, 'prompt_token_count', 0) or 0)
+    LLM_TOKENS.labels(source, 'completion').inc(getattr(usage, 'candidates_token_count', 0) or 0)
+
+
+class DriverPoolCollector:
+    """Reads the driver pool's counts at scrape time; drivers are shared, so not per source"""
+
+    def collect(self):
+        stats = driver_pool.stats()
+        drivers = GaugeMetricFamily('crawler_browser_drivers', 'Chrome drivers in the pool', labels=['state'])
+        drivers.add_metric(['leased'], stats['leased'])
+        drivers.add_metric(['idle'], stats['idle'])
+        yield drivers
+        yield GaugeMetricFamily('crawler_browser_drivers_max', 'Driver pool size limit', value=stats['max_size'])
+
+
+REGISTRY.register(DriverPoolCollector())
+
+
+def render():
+    """Exposition text of every metric in this process and its content type"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,200 @@
+#pagination.py
+import logging
+import re
+import uuid
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from app import db
+from app.models.sources import Source
+from app.services.crawler import genPageLink, getHtmlFile
+from app.services.driver_pool import driver_pool
+from app.services.fetcher import fetch_http
+from app.services.html_parser import make_soup
+
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER = '{page}'
+
+PAGE_PARAMS = ('page', 'p', 'pg', 'paged', 'trang', 'pageindex', 'page_no', 'pagenumber', 'pagenum')
+# Often a product or post id; only a page number on the listing's own path
+AMBIGUOUS_PARAMS = ('p',)
+
+# Ordered from most to least specific; group 2 is the page number
+PATH_PATTERNS = [
+    re.compile(r'(/page/)(\d+)(/?)$', re.IGNORECASE),
+    re.compile(r'(/trang-)(\d+)(/?)$', re.IGNORECASE),
+    re.compile(r'(-p)(\d+)(/?|\.html?)$', re.IGNORECASE),
+    re.compile(r'(/p)(\d+)(/?)$', re.IGNORECASE),
+]
+
+
+def template_from_url(url: str, base_url: Optional[str] = None) -> Optional[Tuple[str, int]]:
+    """Turn a URL carrying a page number into a template plus that number.
+
+    Ambiguous params such as ``p`` only count when ``base_url`` is given and
+    the URL is on the same listing path.
+    """
+    parts = urlsplit(url)
+    if parts.query:
+        same_path = base_url is not None and _listing_path(url) == _listing_path(base_url)
+        for name in PAGE_PARAMS:
+            if name in AMBIGUOUS_PARAMS and not same_path:
+                continue
+            match = re.search(r'(?:^|&)(' + re.escape(name) + r'=)(\d+)(?=&|$)', parts.query, re.IGNORECASE)
+            if match:
+                query = parts.query[:match.start(2)] + PLACEHOLDER + parts.query[match.end(2):]
+                return parts._replace(query=query).geturl(), int(match.group(2))
+    for pattern in PATH_PATTERNS:
+        match = pattern.search(parts.path)
+        if match:
+            path = parts.path[:match.start(2)] + PLACEHOLDER + parts.path[match.end(2):]
+            return parts._replace(path=path).geturl(), int(match.group(2))
+    return None
+
+
+def _matches(template: str, url: str) -> Optional[int]:
+    regex = re.escape(template).replace(re.escape(PLACEHOLDER), r'(\d+)')
+    match = re.fullmatch(regex, url)
+    return int(match.group(1)) if match else None
+
+
+def render_pages(template: str, base_url: str, numberofpage: int) -> List[str]:
+    """Expand a template from the base URL's page (or page 1 when it has none)"""
+    start = _matches(template, base_url)
+    if start is not None:
+        return [template.replace(PLACEHOLDER, str(i)) for i in range(start, start + numberofpage)]
+    return [base_url] + [template.replace(PLACEHOLDER, str(i)) for i in range(2, numberofpage + 1)]
+
+
+def _append_query_template(base_url: str) -> str:
+    return base_url + ('&' if '?' in base_url else '?') + 'page=' + PLACEHOLDER
+
+
+def _listing_path(url: str) -> str:
+    """Path of a listing URL without its page segment, trailing slash or .html"""
+    path = urlsplit(url).path.replace(PLACEHOLDER, '1')
+    for pattern in PATH_PATTERNS:
+        match = pattern.search(path)
+        if match:
+            path = path[:match.start()]
+            break
+    path = re.sub(r'\.html?$', '', path, flags=re.IGNORECASE)
+    return path.rstrip('/').lower()
+
+
+def _same_listing(base_url: str, template: str) -> bool:
+    """Template pages the base listing, not another category of the same site"""
+    base, candidate = urlsplit(base_url), urlsplit(template)
+    return base.netloc == candidate.netloc and _listing_path(base_url) == _listing_path(template)
+
+
+def detect_from_html(base_url: str, html: str, next_selector: Optional[str] = None) -> Optional[str]:
+    """Find the pattern from the listing's own pagination links"""
+    soup = make_soup(html)
+    if next_selector:
+        try:
+            element = soup.select_one(next_selector)
+        except Exception:
+            element = None
+        href = element.get('href') if element is not None else None
+        if href:
+            detected = template_from_url(urljoin(base_url, href), base_url)
+            if detected and _same_listing(base_url, detected[0]):
+                return detected[0]
+
+    # Otherwise look for a link to page 2 of this same listing
+    for anchor in soup.find_all('a', href=True):
+        detected = template_from_url(urljoin(base_url, anchor['href']), base_url)
+        if detected and detected[1] == 2 and _same_listing(base_url, detected[0]):
+            return detected[0]
+    return None
+
+
+def listing_html(base_url: str, config: Dict) -> Optional[str]:
+    """The listing page over plain HTTP, or rendered in Chrome when the site refuses plain requests"""
+    html = fetch_http(base_url)
+    if html is not None:
+        return html
+    driver, html = getHtmlFile(base_url, None, True, config)
+    driver_pool.release(driver)
+    return html
+
+
+def follow_next_links(base_url: str, next_selector: str, numberofpage: int) -> List[str]:
+    """Walk rel-next style links when the page numbers are not in the URL"""
+    urls, current = [base_url], base_url
+    while len(urls) < numberofpage:
+        html = fetch_http(current)
+        if html is None:
+            break
+        try:
+            element = make_soup(html).select_one(next_selector)
+        except Exception:
+            break
+        if element is None or not element.get('href'):
+            break
+        current = urljoin(current, element['href'])
+        if current in urls:
+            break
+        urls.append(current)
+    return urls
+
+
+def remember_pattern(config: Dict, template: str):
+    """Persist the detected template on the Source so later runs skip detection"""
+    config['pagination_pattern'] = template
+    try:
+        Source.query.filter_by(id=uuid.UUID(config['id'])).update({'pagination_pattern': template})
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"Could not persist pagination pattern for source {config['id']}: {e}")
+
+
+def page_urls(config: Dict, numberofpage: int = 3) -> List[str]:
+    """Paginated listing URLs for a source, using the LLM only when nothing local works"""
+    base_url = config['url']
+    template = config.get('pagination_pattern')
+    if template:
+        return render_pages(template, base_url, numberofpage)
+
+    detected = template_from_url(base_url)
+    template = detected[0] if detected else None
+
+    if template is None:
+        html = listing_html(base_url, config)
+        if html is not None:
+            template = detect_from_html(base_url, html, config.get('next_selector'))
+
+    if template is None and config.get('next_selector'):
+        urls = follow_next_links(base_url, config['next_selector'], numberofpage)
+        if len(urls) > 1:
+            return urls
+
+    if template is None:
+        template = _template_from_llm(base_url, numberofpage)
+
+    if template is None:
+        # Only a guess: not saved, so detection runs again next time instead of
+        # pinning the source to URLs that may all serve page 1
+        print(f"No pagination pattern found for {base_url}, falling back to ?page=")
+        return render_pages(_append_query_template(base_url), base_url, numberofpage)
+
+    print(f"Pagination pattern for {base_url}: {template}")
+    remember_pattern(config, template)
+    return render_pages(template, base_url, numberofpage)
+
+
+def _template_from_llm(base_url: str, numberofpage: int) -> Optional[str]:
+    try:
+        urls = genPageLink(base_url, numberofpage)
+    except Exception as e:
+        print(f"Error generating paginated URLs: {e}")
+        return None
+    for url in urls:
+        detected = template_from_url(url.strip(), base_url)
+        if detected and _same_listing(base_url, detected[0]):
+            return detected[0]
+    return None
@@ -0,0 +1,144 @@
+#politeness.py
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from urllib import robotparser
+from urllib.parse import urlsplit
+
+from app.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+
+class HostBucket:
+    """Token bucket of one host; rate adapts to how the host responds"""
+
+    def __init__(self, rate: float, burst: int):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self.backoff_until = 0.0
+        self.backoff = 0.0
+        self.throttled = 0
+
+
+class PolitenessScheduler:
+    """Per-host request pacing replacing the fixed sleeps of the crawler.
+
+    Each host gets a token bucket of ``rps`` requests per second with ``burst``
+    capacity. 429/503 responses halve the host's rate and pause it (honouring
+    Retry-After), slow responses shrink the rate gently, and fast successes let it
+    climb back. robots.txt Crawl-delay / Request-rate caps the rate when enabled.
+    """
+
+    def __init__(self, rps: float, burst: int, min_rps: float, slow_seconds: float,
+                 max_backoff: float, respect_robots: bool):
+        self.rps = rps
+        self.burst = burst
+        self.min_rps = min_rps
+        self.slow_seconds = slow_seconds
+        self.max_backoff = max_backoff
+        self.respect_robots = respect_robots
+        self._hosts: Dict[str, HostBucket] = {}
+        self._lock = threading.Lock()
+
+    def _robots_rate(self, scheme: str, host: str) -> Optional[float]:
+        # Imported here: fetcher imports this module for request feedback
+        from app.services.fetcher import http_session
+        try:
+            response = http_session.get(f"{scheme}://{host}/robots.txt", timeout=Config.HTTP_TIMEOUT)
+            if response.status_code != 200:
+                return None
+            parser = robotparser.RobotFileParser()
+            parser.parse(response.text.splitlines())
+        except Exception as e:
+            logger.info(f"Could not read robots.txt of {host}: {e}")
+            return None
+        delay = parser.crawl_delay('*')
+        if delay:
+            return 1.0 / float(delay)
+        request_rate = parser.request_rate('*')
+        if request_rate and request_rate.seconds:
+            return request_rate.requests / request_rate.seconds
+        return None
+
+    def _bucket(self, url: str) -> HostBucket:
+        parts = urlsplit(url)
+        host = parts.netloc
+        with self._lock:
+            bucket = self._hosts.get(host)
+        if bucket is not None:
+            return bucket
+
+        rate = self.rps
+        if self.respect_robots:
+            robots_rate = self._robots_rate(parts.scheme or 'https', host)
+            if robots_rate:
+                rate = min(rate, robots_rate)
+        with self._lock:
+            # Another thread may have created it while robots.txt was loading
+            return self._hosts.setdefault(host, HostBucket(rate, self.burst))
+
+    def reserve(self, url: str) -> float:
+        """Take a token for the URL's host and return how long to wait before using it"""
+        bucket = self._bucket(url)
+        with self._lock:
+            now = time.monotonic()
+            bucket.tokens = min(bucket.burst, bucket.tokens + (now - bucket.last) * bucket.rate)
+            bucket.last = now
+            bucket.tokens -= 1
+            wait = -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0.0
+            return max(wait, bucket.backoff_until - now)
+
+    def acquire(self, url: str):
+        """Blocking form of reserve() for callers outside the crawl engine"""
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    def feedback(self, url: str, status: Optional[int] = None, elapsed: Optional[float] = None,
+                 retry_after: Optional[str] = None):
+        """Adapt the host's rate to a response status and latency"""
+        bucket = self._bucket(url)
+        with self._lock:
+            now = time.monotonic()
+            if status in (429, 503):
+                bucket.throttled += 1
+                bucket.rate = max(bucket.rate / 2, self.min_rps)
+                bucket.backoff = min(max(bucket.backoff * 2, 1.0), self.max_backoff)
+                pause = bucket.backoff
+                if retry_after and retry_after.isdigit():
+                    pause = min(float(retry_after), self.max_backoff)
+                bucket.backoff_until = max(bucket.backoff_until, now + pause)
+                logger.warning(f"{urlsplit(url).netloc} returned {status}, slowing to {bucket.rate:.2f} req/s")
+            elif elapsed is not None and elapsed > self.slow_seconds:
+                bucket.rate = max(bucket.rate * 0.8, self.min_rps)
+            elif status is None or status < 400:
+                bucket.backoff = 0.0
+                bucket.rate = min(bucket.rate * 1.1, bucket.max_rate)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                host: {
+                    'rate': round(bucket.rate, 3),
+                    'max_rate': round(bucket.max_rate, 3),
+                    'throttled': bucket.throttled,
+                    'backing_off': bucket.backoff_until > time.monotonic(),
+                }
+                for host, bucket in self._hosts.items()
+            }
+
+
+scheduler = PolitenessScheduler(
+    rps=Config.POLITENESS_RPS,
+    burst=Config.POLITENESS_BURST,
+    min_rps=Config.POLITENESS_MIN_RPS,
+    slow_seconds=Config.POLITENESS_SLOW_SECONDS,
+    max_backoff=Config.POLITENESS_MAX_BACKOFF,
+    respect_robots=Config.POLITENESS_RESPECT_ROBOTS,
+)
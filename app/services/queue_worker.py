@@ -0,0 +1,226 @@
+#queue_worker.py
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Dict, Optional
+
+from app.config import Config
+from app.models.jobs import CrawlJob
+from app.services import work_queue
+from app.services.crawl_engine import CrawlEngine, LISTING, SourceState, WorkItem
+from app.services.crawler import (
+    get_all_web_crawl,
+    get_dynamic_model,
+)
+from app.services.result_writer import result_writer
+from app.services.seen_index import SeenUrlIndex
+
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class QueueWorker(CrawlEngine):
+    """Crawl engine fed from the shared crawl_tasks table instead of an in-process queue.
+
+    Any number of workers on any number of machines claim tasks with
+    FOR UPDATE SKIP LOCKED, keep their leases alive with heartbeats and hand
+    failed tasks back for another attempt. Product links found on a listing go
+    back into the table, so whichever worker is free picks them up.
+    """
+
+    def __init__(self, app, api_key: Optional[str], worker_id: Optional[str] = None, concurrency: int = None, **kwargs):
+        super().__init__(app, api_key, **kwargs)
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = concurrency or Config.WORKER_CONCURRENCY
+        self._states: Dict[tuple, Optional[SourceState]] = {}
+        self._states_lock = asyncio.Lock()
+        self._reported: Dict[tuple, Dict[str, int]] = {}
+        # Tasks of each job running on this worker; a job's states are only dropped at zero
+        self._active: Dict[str, int] = {}
+
+    def _load_source(self, job_id: str, source_id: str):
+        """Config, model and seen index for one source of a job, or None when it cannot be crawled"""
+        configs = get_all_web_crawl(source_id, with_attributes=True)
+        job = CrawlJob.query.filter_by(id=uuid.UUID(job_id)).first()
+        if not configs or job is None or not configs[0]['attributes']:
+            return None
+        config = configs[0]
+        freshness = Config.CRAWL_FRESHNESS_HOURS if job.incremental else None
+        return config, get_dynamic_model(source_id, config['attributes']), SeenUrlIndex(source_id, freshness).load()
+
+    async def _state_for(self, job_id: str, source_id: str) -> Optional[SourceState]:
+        key = (job_id, source_id)
+        async with self._states_lock:
+            if key not in self._states:
+                loaded = await self._call(self._load_source, job_id, source_id)
+                state = None
+                if loaded is not None:
+                    state = self._new_state(*loaded)
+                    state.job_id = job_id
+                    state.stats = {'url': loaded[0]['url']}
+                self._states[key] = state
+            return self._states[key]
+
+    async def _enqueue_products(self, source: SourceState, links):
+        await self._call(work_queue.enqueue, source.job_id, source.config['id'], 'product', links)
+
+    async def _run_task(self, task: Dict):
+        job_id = task['job_id']
+        self._active[job_id] = self._active.get(job_id, 0) + 1
+        try:
+            await self._run_claimed(task)
+        finally:
+            self._active[job_id] -= 1
+            if not self._active[job_id]:
+                del self._active[job_id]
+
+    async def _run_claimed(self, task: Dict):
+        error = None
+        state = await self._state_for(task['job_id'], task['source_id'])
+        if state is None:
+            ok, error = False, 'source is inactive or has no attributes'
+        else:
+            item = WorkItem(task['kind'], task['url'], state)
+            try:
+                if item.kind == LISTING:
+                    ok = await self._process_listing(item) is not False
+                else:
+                    ok = await self._process_product(item)
+            except Exception as e:
+                print(f"Error processing {item.kind} {item.url}: {e}")
+                self._count(state, 'failed')
+                ok, error = False, str(e)
+
+        if ok:
+            await self._call(work_queue.complete, task['id'])
+        else:
+            await self._call(work_queue.fail, task['id'], task['attempts'], error)
+        if await self._call(self._finish_if_drained, task['job_id']):
+            await self._drop_job(task['job_id'])
+
+    def _finish_if_drained(self, job_id: str) -> bool:
+        """Complete the job once no task is left; True when it is drained"""
+        counts = work_queue.task_counts(job_id)
+        if counts.get('PENDING') or counts.get('LEASED'):
+            return False
+        # Rows of this worker must be in the DB before the job is reported finished
+        result_writer.flush()
+        if work_queue.finish_job_if_drained(job_id):
+            print(f"Distributed crawl job {job_id} completed: {counts}")
+        return True
+
+    async def _drop_job(self, job_id: str):
+        """Report a finished job's last counters, then close and forget its source states.
+
+        Each state holds a BatchExtractor collector thread and a SeenUrlIndex of
+        every stored URL of the source, so a long-lived worker must not keep them.
+        """
+        await self._report_progress()
+        async with self._states_lock:
+            keys = [key for key in self._states if key[0] == job_id]
+            states = [self._states.pop(key) for key in keys]
+            for key in keys:
+                self._reported.pop(key, None)
+        for state in states:
+            if state is not None:
+                await self._call(state.extractor.close)
+
+    async def _drop_finished_jobs(self):
+        """Drop the states of jobs that were stopped or finished by another worker"""
+        idle = {job_id for job_id, _ in self._states} - set(self._active)
+        if not idle:
+            return
+        try:
+            states = await self._call(work_queue.job_states, idle)
+        except Exception as e:
+            logger.warning(f"Could not check the state of jobs {sorted(idle)}: {e}")
+            return
+        for job_id in idle:
+            if states.get(job_id) != 'RUNNING':
+                await self._drop_job(job_id)
+
+    async def _report_progress(self):
+        """Add what this worker did since the last report to each job's counters"""
+        for (job_id, source_id), state in list(self._states.items()):
+            if state is None:
+                continue
+            reported = self._reported.setdefault((job_id, source_id), {})
+            deltas = {}
+            for key in work_queue.JOB_COUNTERS:
+                current = state.stats.get(key, 0)
+                deltas[key] = current - reported.get(key, 0)
+                reported[key] = current
+            try:
+                await self._call(work_queue.add_job_counts, job_id, deltas)
+            except Exception as e:
+                logger.warning(f"Could not update counters of job {job_id}: {e}")
+
+    async def _reporter(self):
+        while True:
+            await asyncio.sleep(Config.JOB_PROGRESS_INTERVAL)
+            await self._report_progress()
+            await self._drop_finished_jobs()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(Config.WORKER_HEARTBEAT_INTERVAL)
+            try:
+                await self._call(work_queue.heartbeat, self.worker_id)
+            except Exception as e:
+                logger.warning(f"Heartbeat of worker {self.worker_id} failed: {e}")
+
+    async def run(self) -> Dict:
+        """Claim and process tasks until the stop flag is set"""
+        # One blocking call per task slot plus claim, heartbeat and reporter
+        self._open(self.concurrency + 3)
+        with self.app.app_context():
+            result_writer.start(self.app)
+        print(f"Worker {self.worker_id} started with {self.concurrency} task slots")
+
+        in_flight = set()
+        background = [asyncio.create_task(self._heartbeat()), asyncio.create_task(self._reporter())]
+        try:
+            while not self.stop.is_set():
+                free = self.concurrency - len(in_flight)
+                tasks = []
+                if free > 0:
+                    try:
+                        for job_id in await self._call(work_queue.reap_expired):
+                            await self._call(self._finish_if_drained, job_id)
+                        tasks = await self._call(work_queue.claim, self.worker_id, free)
+                    except Exception as e:
+                        logger.warning(f"Worker {self.worker_id} could not claim tasks: {e}")
+                for task in tasks:
+                    in_flight.add(asyncio.create_task(self._run_task(task)))
+                if in_flight:
+                    done, in_flight = await asyncio.wait(
+                        in_flight, timeout=Config.WORKER_POLL_INTERVAL, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for finished in done:
+                        if finished.exception() is not None:
+                            # The lease runs out and another worker retries the task
+                            logger.warning(f"Worker {self.worker_id} lost a task: {finished.exception()}")
+                else:
+                    await asyncio.sleep(Config.WORKER_POLL_INTERVAL)
+        finally:
+            # Finish the tasks in hand before handing leases back, or another worker
+            # could claim a URL this one is still fetching and writing. Heartbeats
+            # keep those leases alive meanwhile.
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+            try:
+                await self._call(work_queue.release, self.worker_id)
+            except Exception as e:
+                logger.warning(f"Worker {self.worker_id} could not release its leases: {e}")
+            await self._close([state.extractor for state in self._states.values() if state is not None])
+            result_writer.flush()
+            print(f"Worker {self.worker_id} stopped: {self.stats}")
+        return self.stats
@@ -0,0 +1,182 @@
+#readiness.py
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from app.config import Config
+from app.services.html_parser import safe_select
+from app.services.metrics import READY_SECONDS, source_label
+
+
+logger = logging.getLogger(__name__)
+
+READY_SELECTOR = 'selector'
+READY_NETWORK_IDLE = 'network_idle'
+READY_SCROLL = 'scroll'
+READY_STRATEGIES = (READY_SELECTOR, READY_NETWORK_IDLE, READY_SCROLL)
+
+POLL_SECONDS = 0.1
+
+_RESOURCE_COUNT_JS = "return performance.getEntriesByType('resource').length"
+_SCROLL_JS = "window.scrollTo(0, document.body.scrollHeight); return document.body.scrollHeight"
+
+
+class ReadinessWaiter:
+    """Waits until a rendered page holds what we want instead of sleeping a fixed time.
+
+    ``selector`` waits for the source's selector to match, ``network_idle`` waits
+    until no new resource has loaded for READY_IDLE_MS, and ``scroll`` also scrolls
+    infinite listing pages until the selector stops matching more elements. A selector
+    that times out max_selector_timeouts pages in a row on a source is given up
+    for that source in favour of ``network_idle``. Time-to-ready is recorded per
+    page (crawler_ready_seconds) and summed per source and strategy.
+    """
+
+    def __init__(self, timeout: float, idle_ms: int, scroll_steps: int, scroll_pause: float,
+                 max_selector_timeouts: int):
+        self.timeout = timeout
+        self.idle_ms = idle_ms
+        self.scroll_steps = scroll_steps
+        self.scroll_pause = scroll_pause
+        self.max_selector_timeouts = max_selector_timeouts
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Dict]] = {}
+        # Consecutive selector timeouts per (source, selector); selectors past the limit are skipped
+        self._selector_timeouts: Dict[tuple, int] = {}
+
+    def _selector_given_up(self, key: tuple) -> bool:
+        with self._lock:
+            return self.max_selector_timeouts > 0 and self._selector_timeouts.get(key, 0) >= self.max_selector_timeouts
+
+    def _selector_result(self, key: tuple, timed_out: bool):
+        with self._lock:
+            if not timed_out:
+                self._selector_timeouts.pop(key, None)
+                return
+            self._selector_timeouts[key] = self._selector_timeouts.get(key, 0) + 1
+            given_up = self._selector_timeouts[key] == self.max_selector_timeouts
+        if given_up:
+            logger.warning(
+                f"Selector {key[1]!r} of source {key[0]} timed out {self.max_selector_timeouts} pages in a row, "
+                f"waiting for network idle instead"
+            )
+
+    def wait(self, driver, config: Optional[Dict], selector: Optional[str], listing: bool = False) -> float:
+        """Block until the page is ready for the given selector and return the ms it took.
+
+        ``scroll`` only applies to listing pages; detail pages of a scroll source
+        wait for their selector like any other.
+        """
+        source = source_label(config)
+        strategy = (config or {}).get('ready_strategy') or READY_SELECTOR
+        if strategy == READY_SCROLL and not listing:
+            strategy = READY_SELECTOR
+        key = (source, selector)
+        if strategy != READY_NETWORK_IDLE and selector and self._selector_given_up(key):
+            # Scrolling still works without the selector, by page height
+            strategy = READY_NETWORK_IDLE if strategy == READY_SELECTOR else strategy
+            selector = None
+        started = time.monotonic()
+        timed_out = False
+        try:
+            if strategy == READY_NETWORK_IDLE:
+                self._wait_network_idle(driver)
+            elif strategy == READY_SCROLL:
+                if selector:
+                    self._wait_selector(driver, selector)
+                else:
+                    self._wait_network_idle(driver)
+                self._scroll(driver, selector, (config or {}).get('scroll_steps') or self.scroll_steps)
+            else:
+                self._wait_selector(driver, selector)
+        except TimeoutException:
+            timed_out = True
+        elapsed_ms = (time.monotonic() - started) * 1000
+        if strategy != READY_NETWORK_IDLE and selector:
+            self._selector_result(key, timed_out)
+        self._record(source, strategy, elapsed_ms, timed_out)
+        if timed_out:
+            logger.info(f"Page {driver.current_url} not ready after {elapsed_ms:.0f} ms ({strategy})")
+        return elapsed_ms
+
+    def _count(self, driver, selector: str) -> int:
+        matches = safe_select(driver, selector)
+        return -1 if matches is None else len(matches)
+
+    def _wait_selector(self, driver, selector: Optional[str]):
+        if not selector or self._count(driver, selector) < 0:
+            WebDriverWait(driver, self.timeout, POLL_SECONDS).until(
+                lambda d: d.execute_script('return document.readyState') != 'loading'
+            )
+            return
+        WebDriverWait(driver, self.timeout, POLL_SECONDS).until(lambda d: self._count(d, selector) > 0)
+
+    def _wait_network_idle(self, driver):
+        deadline = time.monotonic() + self.timeout
+        last_count, last_change = -1, time.monotonic()
+        while time.monotonic() < deadline:
+            try:
+                count = driver.execute_script(_RESOURCE_COUNT_JS)
+            except WebDriverException:
+                count = last_count
+            now = time.monotonic()
+            if count != last_count:
+                last_count, last_change = count, now
+            elif (now - last_change) * 1000 >= self.idle_ms:
+                return
+            time.sleep(POLL_SECONDS)
+        raise TimeoutException(f"network did not go idle within {self.timeout}s")
+
+    def _scroll(self, driver, selector: Optional[str], steps: int):
+        count = self._count(driver, selector) if selector else -1
+        for _ in range(steps):
+            height = driver.execute_script(_SCROLL_JS)
+            try:
+                WebDriverWait(driver, self.scroll_pause, POLL_SECONDS).until(
+                    lambda d: (self._count(d, selector) > count) if count >= 0
+                    else d.execute_script('return document.body.scrollHeight') > height
+                )
+            except TimeoutException:
+                # Nothing more loaded after this scroll, the list is complete
+                break
+            if count >= 0:
+                count = self._count(driver, selector)
+
+    def _record(self, source: str, strategy: str, elapsed_ms: float, timed_out: bool):
+        READY_SECONDS.labels(source, strategy).observe(elapsed_ms / 1000)
+        with self._lock:
+            entry = self._stats.setdefault(source, {}).setdefault(
+                strategy, {'pages': 0, 'timeouts': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            )
+            entry['pages'] += 1
+            entry['timeouts'] += int(timed_out)
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                source: {
+                    strategy: {
+                        'pages': entry['pages'],
+                        'timeouts': entry['timeouts'],
+                        'avg_ms': round(entry['total_ms'] / entry['pages'], 1),
+                        'max_ms': round(entry['max_ms'], 1),
+                    }
+                    for strategy, entry in strategies.items()
+                }
+                for source, strategies in self._stats.items()
+            }
+
+
+readiness = ReadinessWaiter(
+    timeout=Config.READY_TIMEOUT,
+    idle_ms=Config.READY_IDLE_MS,
+    scroll_steps=Config.READY_SCROLL_STEPS,
+    scroll_pause=Config.READY_SCROLL_PAUSE,
+    max_selector_timeouts=Config.READY_SELECTOR_MAX_TIMEOUTS,
+)
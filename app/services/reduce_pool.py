@@ -0,0 +1,124 @@
+#reduce_pool.py
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+
+from app.config import Config
+from app.services.reducer import ReducedPage, reduce_page
+
+
+logger = logging.getLogger(__name__)
+
+
+def _reduce_in_child(html: str, card_selector: Optional[str], base_url: Optional[str]) -> Tuple[ReducedPage, float]:
+    started = time.process_time()
+    page = reduce_page(html, card_selector, base_url)
+    return page, time.process_time() - started
+
+
+class ReducePool:
+    """Runs reduce_page in worker processes so parsing does not hold the crawler's GIL.
+
+    Only the raw HTML goes in and the compact ReducedPage comes back. Children are
+    started from a forkserver, never forked from the threaded crawler process.
+    With size 0 pages are reduced in the calling thread.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._started_at = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self._busy_seconds = 0.0
+        self._total_ms = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context('forkserver')
+                context.set_forkserver_preload(['app.services.reducer'])
+                self._executor = ProcessPoolExecutor(max_workers=self.size, mp_context=context)
+                self._started_at = time.monotonic()
+            return self._executor
+
+    def submit(self, html: str, card_selector: Optional[str] = None, base_url: Optional[str] = None) -> Future:
+        """Reduce a page in the pool; the future resolves to a ReducedPage"""
+        result = Future()
+        if self.size <= 0:
+            try:
+                result.set_result(reduce_page(html, card_selector, base_url))
+            except Exception as e:
+                result.set_exception(e)
+            return result
+
+        submitted_at = time.monotonic()
+        try:
+            child = self._get_executor().submit(_reduce_in_child, html, card_selector, base_url)
+        except BrokenProcessPool:
+            self._reset()
+            child = self._get_executor().submit(_reduce_in_child, html, card_selector, base_url)
+        with self._lock:
+            self.submitted += 1
+
+        def done(child_future: Future):
+            try:
+                page, cpu_seconds = child_future.result()
+            except BrokenProcessPool as e:
+                # A child died; start a fresh pool for the next page
+                self._reset()
+                self._record(None, submitted_at)
+                result.set_exception(e)
+                return
+            except Exception as e:
+                self._record(None, submitted_at)
+                result.set_exception(e)
+                return
+            self._record(cpu_seconds, submitted_at)
+            result.set_result(page)
+
+        child.add_done_callback(done)
+        return result
+
+    def _record(self, cpu_seconds: Optional[float], submitted_at: float):
+        with self._lock:
+            if cpu_seconds is None:
+                self.failed += 1
+                return
+            self.completed += 1
+            self._busy_seconds += cpu_seconds
+            self._total_ms += (time.monotonic() - submitted_at) * 1000
+
+    def _reset(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        self._reset()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+            capacity = uptime * self.size
+            return {
+                'processes': self.size,
+                'running': self._executor is not None,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'in_flight': self.submitted - self.completed - self.failed,
+                # Share of the pool's CPU time spent reducing since it started
+                'utilization': round(self._busy_seconds / capacity, 3) if capacity else 0.0,
+                'avg_ms': round(self._total_ms / self.completed, 1) if self.completed else 0.0,
+            }
+
+
+reduce_pool = ReducePool(Config.REDUCE_PROCESSES)
@@ -0,0 +1,122 @@
+#reducer.py
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import urljoin
+
+from app.config import Config
+from app.services.html_parser import make_soup, safe_select
+
+
+# Rough Gemini ratio for mixed Vietnamese/English text
+CHARS_PER_TOKEN = 4
+
+BOILERPLATE_TAGS = [
+    'script', 'style', 'noscript', 'template', 'iframe', 'svg', 'canvas',
+    'nav', 'header', 'footer', 'aside', 'form', 'button', 'link', 'meta',
+]
+
+TRACKING_PATTERNS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+    'googlesyndication.com', 'facebook.com/tr', 'connect.facebook.net',
+    'scorecardresearch.com', 'hotjar.com', 'criteo.', 'adservice.',
+    '/pixel', 'pixel.', 'beacon', '/analytics',
+)
+
+IMAGE_ATTRS = ('src', 'data-src', 'data-original', 'data-lazy-src')
+
+_whitespace = re.compile(r'[ \t\r\f\v]+')
+_blank_lines = re.compile(r'\n\s*\n+')
+
+
+@dataclass
+class ReducedPage:
+    text: str
+    images: List[str] = field(default_factory=list)
+    chars_before: int = 0
+    chars_after: int = 0
+    truncated: bool = False
+
+    @property
+    def prompt(self) -> str:
+        if not self.images:
+            return self.text
+        return self.text + "\n" + " ".join(self.images)
+
+
+def _clean_text(text: str) -> str:
+    text = _whitespace.sub(' ', text)
+    return _blank_lines.sub('\n', text).strip()
+
+
+def _is_tracking(url: str) -> bool:
+    lowered = url.lower()
+    return any(pattern in lowered for pattern in TRACKING_PATTERNS)
+
+
+def _is_pixel(img) -> bool:
+    return img.get('width') in ('0', '1') or img.get('height') in ('0', '1')
+
+
+def _collect_images(nodes, base_url: Optional[str]) -> List[str]:
+    images, seen = [], set()
+    for node in nodes:
+        for img in node.find_all('img'):
+            if _is_pixel(img):
+                continue
+            src = next((img.get(attr) for attr in IMAGE_ATTRS if img.get(attr)), None)
+            if not src or src.startswith('data:'):
+                continue
+            src = urljoin(base_url, src.strip()) if base_url else src.strip()
+            if src.lower().split('?')[0].endswith('.svg') or _is_tracking(src):
+                continue
+            if src not in seen:
+                seen.add(src)
+                images.append(src)
+    return images[:Config.REDUCER_MAX_IMAGES]
+
+
+def _select_region(soup, card_selector: Optional[str]):
+    if card_selector:
+        nodes = safe_select(soup, card_selector)
+        if nodes:
+            return nodes
+    return [soup.body or soup]
+
+
+def reduce_page(html: str, card_selector: Optional[str] = None, base_url: Optional[str] = None,
+                token_budget: Optional[int] = None) -> ReducedPage:
+    """Shrink a page to the text and images of its content region within a token budget"""
+    soup = make_soup(html)
+    chars_before = len(soup.get_text()) + sum(len(img.get('src') or '') + 1 for img in soup.find_all('img'))
+
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+
+    region = _select_region(soup, card_selector)
+    text = _clean_text("\n".join(node.get_text("\n") for node in region))
+    images = _collect_images(region, base_url)
+    if not images and region[0] is not (soup.body or soup):
+        images = _collect_images([soup.body or soup], base_url)
+
+    budget = token_budget if token_budget is not None else Config.REDUCER_TOKEN_BUDGET
+    truncated = False
+    if budget:
+        max_chars = budget * CHARS_PER_TOKEN
+        image_chars = sum(len(src) + 1 for src in images)
+        if image_chars > max_chars // 4:
+            # Images never take more than a quarter of the budget
+            kept, used = [], 0
+            for src in images:
+                if used + len(src) + 1 > max_chars // 4:
+                    break
+                kept.append(src)
+                used += len(src) + 1
+            images, image_chars = kept, used
+        if len(text) + image_chars > max_chars:
+            text = text[:max(max_chars - image_chars, 0)]
+            truncated = True
+
+    page = ReducedPage(text=text, images=images, chars_before=chars_before, truncated=truncated)
+    page.chars_after = len(page.prompt)
+    return page
@@ -0,0 +1,69 @@
+#resource_blocking.py
+import logging
+import threading
+import weakref
+from typing import Dict, List, Optional
+
+from app.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_NONE = 'none'
+PROFILE_MEDIA = 'media'
+PROFILE_STRICT = 'strict'
+
+
+def _extension_patterns(*extensions: str) -> List[str]:
+    # Anchored to the end of the path or the start of a query string ('?' is a
+    # literal for Network.setBlockedURLs, only '*' is a wildcard), so hosts like
+    # www.pngtree.com or cdn.icons8.com and the pages on them stay allowed
+    return [pattern for ext in extensions for pattern in (f'*.{ext}', f'*.{ext}?*')]
+
+
+IMAGE_PATTERNS = _extension_patterns('jpg', 'jpeg', 'png', 'gif', 'webp', 'avif', 'bmp', 'ico', 'svg')
+MEDIA_PATTERNS = _extension_patterns('mp4', 'webm', 'm3u8', 'mp3', 'ogg', 'wav')
+FONT_PATTERNS = _extension_patterns('woff', 'woff2', 'ttf', 'otf', 'eot')
+TRACKER_PATTERNS = [
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*googlesyndication.com*', '*googleadservices.com*', '*adservice.google.*',
+    '*connect.facebook.net*', '*facebook.com/tr*', '*analytics.tiktok.com*',
+    '*hotjar.com*', '*clarity.ms*', '*scorecardresearch.com*', '*criteo.*',
+    '*taboola.com*', '*outbrain.com*', '*amazon-adsystem.com*',
+]
+
+# Blocking stops the download only: <img src> and friends stay in the DOM
+PROFILES: Dict[str, List[str]] = {
+    PROFILE_NONE: [],
+    PROFILE_MEDIA: IMAGE_PATTERNS + MEDIA_PATTERNS + FONT_PATTERNS,
+    PROFILE_STRICT: IMAGE_PATTERNS + MEDIA_PATTERNS + FONT_PATTERNS + TRACKER_PATTERNS,
+}
+
+# Profile currently installed on each Chrome instance; drivers are shared across sources
+_applied = weakref.WeakKeyDictionary()
+_applied_lock = threading.Lock()
+
+
+def profile_for(config: Optional[Dict]) -> str:
+    profile = (config or {}).get('block_profile') or Config.BROWSER_BLOCK_PROFILE
+    if profile not in PROFILES:
+        logger.warning(f"Unknown block profile {profile!r}, loading every resource")
+        return PROFILE_NONE
+    return profile
+
+
+def apply_profile(driver, config: Optional[Dict]):
+    """Install the source's blocklist on the driver through CDP before it loads a page"""
+    profile = profile_for(config)
+    with _applied_lock:
+        if _applied.get(driver) == profile:
+            return
+    try:
+        if profile != PROFILE_NONE:
+            driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': PROFILES[profile]})
+    except Exception as e:
+        logger.warning(f"Could not apply block profile {profile}: {e}")
+        return
+    with _applied_lock:
+        _applied[driver] = profile
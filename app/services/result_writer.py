@@ -0,0 +1,178 @@
+#result_writer.py
+import logging
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.config import Config
+from app.models.results import Result
+from app.services.metrics import DB_WRITE_SECONDS, ROWS_WRITTEN
+
+
+logger = logging.getLogger(__name__)
+
+
+class _FlushRequest:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class ResultWriter:
+    """Background writer that batches Result rows from every crawler worker.
+
+    Rows are buffered and written with one multi-row upsert per flush, either when
+    batch_size rows are waiting or flush_interval seconds have passed. Results keep
+    one current row per (source_id, url).
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = None
+        self._app = None
+        self._lock = threading.Lock()
+        self._buffered = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def start(self, app):
+        """Start the writer thread once per process"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._app = app
+            self._thread = threading.Thread(target=self._run, name='result-writer', daemon=True)
+            self._thread.start()
+
+    def put(self, source_id: str, url: str, content: Dict,
+            etag: str = None, last_modified: str = None, content_hash: str = None,
+            schema_fingerprint: str = None):
+        self._queue.put({
+            'id': uuid.uuid4(),
+            'source_id': uuid.UUID(source_id),
+            'url': url,
+            'contents': content,
+            'time_stamp': datetime.now(),
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_hash': content_hash,
+            'schema_fingerprint': schema_fingerprint,
+        })
+
+    def flush(self, timeout: float = None):
+        """Block until every row queued before this call has been written"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        request = _FlushRequest()
+        self._queue.put(request)
+        request.done.wait(timeout)
+
+    def _run(self):
+        with self._app.app_context():
+            buffer: List[Dict] = []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+                except queue.Empty:
+                    item = None
+
+                if isinstance(item, _FlushRequest):
+                    self._write(buffer)
+                    buffer = []
+                    item.done.set()
+                elif item is not None:
+                    buffer.append(item)
+                self._buffered = len(buffer)
+
+                if len(buffer) >= self.batch_size or (buffer and time.monotonic() >= deadline):
+                    self._write(buffer)
+                    buffer = []
+                if time.monotonic() >= deadline:
+                    deadline = time.monotonic() + self.flush_interval
+                self._buffered = len(buffer)
+
+    def _write(self, rows: List[Dict]):
+        if not rows:
+            return
+        # ON CONFLICT cannot touch the same row twice in one statement, keep the last copy
+        rows = list({(row['source_id'], row['url']): row for row in rows}.values())
+        started = time.perf_counter()
+        try:
+            db.session.execute(self._upsert(rows))
+            db.session.commit()
+            written = len(rows)
+            for row in rows:
+                ROWS_WRITTEN.labels(str(row['source_id']), 'written').inc()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Bulk insert of {len(rows)} results failed, retrying row by row: {e}")
+            written = self._write_one_by_one(rows)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        DB_WRITE_SECONDS.observe(elapsed_ms / 1000)
+
+        with self._lock:
+            self.flushes += 1
+            self.rows_written += written
+            self.rows_failed += len(rows) - written
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+        print(f"Saved {written}/{len(rows)} results to database in {elapsed_ms:.0f} ms")
+
+    def _upsert(self, rows: List[Dict]):
+        stmt = insert(Result.__table__).values(rows)
+        return stmt.on_conflict_do_update(
+            constraint='uq_results_source_url',
+            set_={
+                'contents': stmt.excluded.contents,
+                'time_stamp': stmt.excluded.time_stamp,
+                'etag': stmt.excluded.etag,
+                'last_modified': stmt.excluded.last_modified,
+                'content_hash': stmt.excluded.content_hash,
+                'schema_fingerprint': stmt.excluded.schema_fingerprint,
+            },
+        )
+
+    def _write_one_by_one(self, rows: List[Dict]) -> int:
+        written = 0
+        for row in rows:
+            try:
+                db.session.execute(self._upsert([row]))
+                db.session.commit()
+                written += 1
+                ROWS_WRITTEN.labels(str(row['source_id']), 'written').inc()
+            except Exception as e:
+                db.session.rollback()
+                ROWS_WRITTEN.labels(str(row['source_id']), 'failed').inc()
+                print(f"Error saving content from {row['url']} to database: {e}")
+        return written
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize() + self._buffered,
+                'flushes': self.flushes,
+                'rows_written': self.rows_written,
+                'rows_failed': self.rows_failed,
+                'last_flush_ms': round(self.last_flush_ms, 1),
+                'avg_flush_ms': round(self._total_flush_ms / self.flushes, 1) if self.flushes else 0.0,
+                'max_flush_ms': round(self.max_flush_ms, 1),
+            }
+
+
+result_writer = ResultWriter(
+    batch_size=Config.RESULT_WRITER_BATCH_SIZE,
+    flush_interval=Config.RESULT_WRITER_FLUSH_INTERVAL,
+)
@@ -0,0 +1,66 @@
+#seen_index.py
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+
+from app.models.results import Result
+
+
+class SeenUrlIndex:
+    """URLs of one source that are already stored, plus those queued in this run.
+
+    The persistent side is the results table itself (one row per source/url);
+    it is loaded once into memory so every link check is a dict lookup. The
+    stored ETag, Last-Modified and content hash of each URL are kept as well
+    for conditional re-fetching.
+    """
+
+    def __init__(self, source_id: str, freshness_hours: Optional[float] = None):
+        self.source_id = source_id
+        self.freshness_hours = freshness_hours
+        self._fresh: Set[str] = set()
+        self._validators: Dict[str, Dict] = {}
+        self._queued: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def load(self) -> 'SeenUrlIndex':
+        """Read the source's stored URLs and validators; needs an app context"""
+        rows = (
+            Result.query
+            .with_entities(Result.url, Result.time_stamp, Result.etag, Result.last_modified,
+                           Result.content_hash, Result.schema_fingerprint)
+            .filter(Result.source_id == uuid.UUID(self.source_id))
+            .all()
+        )
+        self._validators = {
+            row.url: {
+                'etag': row.etag,
+                'last_modified': row.last_modified,
+                'content_hash': row.content_hash,
+                'schema_fingerprint': row.schema_fingerprint,
+            }
+            for row in rows
+        }
+        if self.freshness_hours is not None:
+            cutoff = datetime.now() - timedelta(hours=self.freshness_hours)
+            self._fresh = {row.url for row in rows if row.time_stamp >= cutoff}
+        print(f"Loaded {len(rows)} stored URLs ({len(self._fresh)} fresh) for source {self.source_id}")
+        return self
+
+    def validators(self, url: str, fingerprint: Optional[str] = None) -> Optional[Dict]:
+        """Stored validators of a URL; None when it was extracted with another attribute schema"""
+        stored = self._validators.get(url)
+        if stored is None or (fingerprint is not None and stored.get('schema_fingerprint') != fingerprint):
+            return None
+        return stored
+
+    def check(self, url: str) -> str:
+        """Return 'new', 'fresh' (crawled recently) or 'duplicate' (already queued this run)"""
+        with self._lock:
+            if url in self._queued:
+                return 'duplicate'
+            self._queued.add(url)
+            if url in self._fresh:
+                return 'fresh'
+            return 'new'
@@ -0,0 +1,221 @@
+#work_queue.py
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+
+from app import db
+from app.config import Config
+from app.models.jobs import CrawlJob
+from app.models.tasks import CrawlTask
+
+
+JOB_COUNTERS = ('listings', 'links_found', 'saved', 'failed', 'unchanged')
+
+# Timestamps are set in SQL so every worker compares leases against the same clock
+_CLAIM_SQL = text("""
+    WITH next AS (
+        SELECT t.id
+        FROM crawl_tasks t
+        JOIN crawl_jobs j ON j.id = t.job_id
+        WHERE j.state = 'RUNNING'
+          AND t.attempts < :max_attempts
+          AND (t.state = 'PENDING' OR (t.state = 'LEASED' AND t.lease_expires_at < LOCALTIMESTAMP))
+        ORDER BY t.created_at
+        LIMIT :limit
+        FOR UPDATE OF t SKIP LOCKED
+    )
+    UPDATE crawl_tasks t
+    SET state = 'LEASED',
+        leased_by = :worker_id,
+        lease_expires_at = LOCALTIMESTAMP + make_interval(secs => :lease_seconds),
+        attempts = t.attempts + 1,
+        updated_at = LOCALTIMESTAMP
+    FROM next
+    WHERE t.id = next.id
+    RETURNING t.id, t.job_id, t.source_id, t.kind, t.url, t.attempts
+""")
+
+# Leases that expired on their last attempt will never be claimed again
+_REAP_SQL = text("""
+    UPDATE crawl_tasks
+    SET state = 'FAILED', error = 'lease expired', leased_by = NULL, updated_at = LOCALTIMESTAMP
+    WHERE state = 'LEASED' AND lease_expires_at < LOCALTIMESTAMP AND attempts >= :max_attempts
+    RETURNING job_id
+""")
+
+_HEARTBEAT_SQL = text("""
+    UPDATE crawl_tasks
+    SET lease_expires_at = LOCALTIMESTAMP + make_interval(secs => :lease_seconds), updated_at = LOCALTIMESTAMP
+    WHERE leased_by = :worker_id AND state = 'LEASED'
+""")
+
+_FINISH_SQL = text("""
+    UPDATE crawl_jobs
+    SET state = 'COMPLETED', finished_at = LOCALTIMESTAMP
+    WHERE id = :job_id AND state = 'RUNNING'
+      AND NOT EXISTS (
+          SELECT 1 FROM crawl_tasks WHERE job_id = :job_id AND state IN ('PENDING', 'LEASED')
+      )
+""")
+
+
+def enqueue(job_id: str, source_id: str, kind: str, urls: Iterable[str]) -> int:
+    """Add tasks for a job; URLs already queued for the job are ignored"""
+    rows = [
+        {'id': uuid.uuid4(), 'job_id': uuid.UUID(job_id), 'source_id': uuid.UUID(source_id),
+         'kind': kind, 'url': url, 'state': 'PENDING', 'attempts': 0}
+        for url in dict.fromkeys(urls)
+    ]
+    if not rows:
+        return 0
+    stmt = insert(CrawlTask.__table__).values(rows).on_conflict_do_nothing(
+        constraint='uq_crawl_tasks_job_kind_url'
+    )
+    try:
+        result = db.session.execute(stmt)
+        db.session.commit()
+        return result.rowcount
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def reap_expired() -> List[str]:
+    """Fail tasks whose lease expired on their last attempt; returns the ids of their jobs"""
+    try:
+        rows = db.session.execute(_REAP_SQL, {'max_attempts': Config.WORKER_MAX_ATTEMPTS}).all()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    # The reaped task may have been a job's last one, so callers check those jobs for completion
+    return list(dict.fromkeys(str(row.job_id) for row in rows))
+
+
+def claim(worker_id: str, limit: int, lease_seconds: float = None) -> List[Dict]:
+    """Lease up to limit runnable tasks; rows locked by other workers are skipped, not waited on"""
+    params = {
+        'worker_id': worker_id,
+        'limit': limit,
+        'lease_seconds': lease_seconds or Config.WORKER_LEASE_SECONDS,
+        'max_attempts': Config.WORKER_MAX_ATTEMPTS,
+    }
+    try:
+        rows = db.session.execute(_CLAIM_SQL, params).mappings().all()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return [
+        {'id': str(row['id']), 'job_id': str(row['job_id']), 'source_id': str(row['source_id']),
+         'kind': row['kind'], 'url': row['url'], 'attempts': row['attempts']}
+        for row in rows
+    ]
+
+
+def heartbeat(worker_id: str, lease_seconds: float = None):
+    """Extend every lease this worker holds"""
+    try:
+        db.session.execute(_HEARTBEAT_SQL, {
+            'worker_id': worker_id,
+            'lease_seconds': lease_seconds or Config.WORKER_LEASE_SECONDS,
+        })
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def _finish_task(task_id: str, fields: Dict):
+    try:
+        CrawlTask.query.filter_by(id=uuid.UUID(task_id)).update(
+            dict(fields, leased_by=None, lease_expires_at=None, updated_at=db.func.localtimestamp())
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def complete(task_id: str):
+    _finish_task(task_id, {'state': 'DONE', 'error': None})
+
+
+def fail(task_id: str, attempts: int, error: str = None):
+    """Give the task back for a retry, or fail it for good after WORKER_MAX_ATTEMPTS"""
+    state = 'FAILED' if attempts >= Config.WORKER_MAX_ATTEMPTS else 'PENDING'
+    _finish_task(task_id, {'state': state, 'error': (error or '')[:500] or None})
+
+
+def release(worker_id: str):
+    """Hand back this worker's unfinished leases on shutdown without spending an attempt"""
+    try:
+        CrawlTask.query.filter_by(leased_by=worker_id, state='LEASED').update({
+            'state': 'PENDING',
+            'attempts': CrawlTask.attempts - 1,
+            'leased_by': None,
+            'lease_expires_at': None,
+        })
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def add_job_counts(job_id: str, counts: Dict[str, int]):
+    """Atomically add one worker's counter deltas to the job row"""
+    deltas = {getattr(CrawlJob, key): getattr(CrawlJob, key) + n for key, n in counts.items() if n}
+    if not deltas:
+        return
+    try:
+        CrawlJob.query.filter_by(id=uuid.UUID(job_id)).update(deltas)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def finish_job_if_drained(job_id: str) -> bool:
+    """Mark a distributed job COMPLETED once none of its tasks are pending or leased"""
+    try:
+        result = db.session.execute(_FINISH_SQL, {'job_id': uuid.UUID(job_id)})
+        db.session.commit()
+        return result.rowcount > 0
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def job_states(job_ids: Iterable[str]) -> Dict[str, str]:
+    """Current state of each given job"""
+    ids = [uuid.UUID(job_id) for job_id in job_ids]
+    if not ids:
+        return {}
+    rows = db.session.query(CrawlJob.id, CrawlJob.state).filter(CrawlJob.id.in_(ids)).all()
+    return {str(job_id): state for job_id, state in rows}
+
+
+def stop_jobs(job_id: Optional[str] = None) -> int:
+    """Stop running distributed jobs, or just one; workers only claim tasks of RUNNING jobs"""
+    try:
+        query = CrawlJob.query.filter_by(state='RUNNING', distributed=True)
+        if job_id:
+            query = query.filter_by(id=uuid.UUID(job_id))
+        stopped = query.update({'state': 'STOPPED', 'finished_at': db.func.localtimestamp()})
+        db.session.commit()
+        return stopped
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def task_counts(job_id: str) -> Dict[str, int]:
+    rows = (
+        db.session.query(CrawlTask.state, db.func.count())
+        .filter(CrawlTask.job_id == uuid.UUID(job_id))
+        .group_by(CrawlTask.state)
+        .all()
+    )
+    return {state: count for state, count in rows}
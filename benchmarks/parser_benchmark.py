@@ -0,0 +1,124 @@
+"""Compare the HTML parser backends on saved pages from our sources.
+
+    python -m benchmarks.parser_benchmark --save      # fetch fixtures from active sources
+    python -m benchmarks.parser_benchmark             # benchmark every installed backend
+
+Fixtures are plain .html files in benchmarks/fixtures (or --fixtures DIR); the
+committed sample_*.html pages keep the benchmark runnable offline.
+Parse and text-extraction times are the median of --repeat runs per page;
+memory is the tracemalloc peak of one parse + text pass. selectolax allocates
+its tree in C, so its peak only counts the Python side. The last line is the
+reducer's output size and time on the same pages.
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+from app.services.html_parser import available_backends, best_backend, parse
+from app.services.reducer import reduce_page
+
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+
+def save_fixtures(directory: Path, details_per_source: int):
+    """Save each active source's listing page and its first few detail pages"""
+    from urllib.parse import urljoin
+
+    from app import create_app
+    from app.services.crawler import get_all_web_crawl
+    from app.services.fetcher import fetch_http
+    from app.services.html_parser import make_soup
+
+    directory.mkdir(parents=True, exist_ok=True)
+    app = create_app()
+    with app.app_context():
+        for source in get_all_web_crawl():
+            html = fetch_http(source['url'])
+            if html is None:
+                print(f"Skipping {source['url']}: not reachable over HTTP")
+                continue
+            (directory / f"{source['id']}_listing.html").write_text(html, encoding='utf-8')
+            try:
+                anchors = make_soup(html).select(source['link_selector'])
+            except Exception:
+                anchors = []
+            hrefs = [a.get('href') for a in anchors if a.get('href')][:details_per_source]
+            for i, href in enumerate(hrefs):
+                detail = fetch_http(urljoin(source['url'], href))
+                if detail is not None:
+                    (directory / f"{source['id']}_detail_{i}.html").write_text(detail, encoding='utf-8')
+            print(f"Saved listing and {len(hrefs)} detail pages of {source['url']}")
+
+
+def _median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def benchmark(pages: List[str], backend: str, repeat: int) -> Dict:
+    parse_ms, text_ms, peak_kb = [], [], []
+    for html in pages:
+        parse_ms.append(_median_ms(lambda: parse(html, backend), repeat))
+        parsed = parse(html, backend)
+        text_ms.append(_median_ms(parsed.text, repeat))
+
+        tracemalloc.start()
+        parse(html, backend).text()
+        peak_kb.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+    return {
+        'parse_ms': sum(parse_ms),
+        'text_ms': sum(text_ms),
+        'peak_kb': max(peak_kb),
+    }
+
+
+def benchmark_reducer(pages: List[str], repeat: int) -> Dict:
+    """Prompt size before and after reduce_page, and its time, summed over the pages"""
+    reduced = [reduce_page(html) for html in pages]
+    return {
+        'chars_before': sum(page.chars_before for page in reduced),
+        'chars_after': sum(page.chars_after for page in reduced),
+        'reduce_ms': sum(_median_ms(lambda: reduce_page(html), repeat) for html in pages),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_DIR)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', action='store_true', help='fetch fixture pages from active sources first')
+    parser.add_argument('--details', type=int, default=3, help='detail pages to save per source')
+    args = parser.parse_args()
+
+    if args.save:
+        save_fixtures(args.fixtures, args.details)
+
+    files = sorted(args.fixtures.glob('*.html'))
+    if not files:
+        parser.error(f"No .html fixtures in {args.fixtures}, run with --save first")
+    pages = [path.read_text(encoding='utf-8', errors='replace') for path in files]
+    total_kb = sum(len(page.encode('utf-8')) for page in pages) / 1024
+
+    print(f"{len(pages)} pages, {total_kb:.0f} KB total, {args.repeat} runs each")
+    print(f"{'backend':<12} {'parse ms':>10} {'text ms':>10} {'peak KB':>10}")
+    for backend in available_backends():
+        result = benchmark(pages, backend, args.repeat)
+        print(f"{backend:<12} {result['parse_ms']:>10.1f} {result['text_ms']:>10.1f} {result['peak_kb']:>10.0f}")
+    print(f"Crawler uses: {best_backend()}")
+
+    reduced = benchmark_reducer(pages, args.repeat)
+    print(f"Reducer: {reduced['chars_before']} -> {reduced['chars_after']} chars "
+          f"in {reduced['reduce_ms']:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Keep one result per source/url and flag incremental jobs
+
+Revision ID: 5e8b0c4d2f61
+Revises: 1a5d3e7f9b20
+Create Date: 2026-10-18 12:02:51.734906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8b0c4d2f61'
+down_revision = '1a5d3e7f9b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Drop older duplicates so the unique constraint can be created
+    op.execute("""
+        DELETE FROM results r
+        USING results newer
+        WHERE r.source_id = newer.source_id
+          AND r.url = newer.url
+          AND (r.time_stamp, r.id::text) < (newer.time_stamp, newer.id::text)
+    """)
+    with op.batch_alter_table('results', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_results_source_url', ['source_id', 'url'])
+
+    with op.batch_alter_table('crawl_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('incremental', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade():
+    with op.batch_alter_table('crawl_jobs', schema=None) as batch_op:
+        batch_op.drop_column('incremental')
+
+    with op.batch_alter_table('results', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_results_source_url', type_='unique')
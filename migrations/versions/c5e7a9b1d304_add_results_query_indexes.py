@@ -0,0 +1,34 @@
+"""Add query indexes to results
+
+Revision ID: c5e7a9b1d304
+Revises: a83f5d2c6e17
+Create Date: 2026-10-18 15:36:27.918402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e7a9b1d304'
+down_revision = 'a83f5d2c6e17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built CONCURRENTLY so a large results table stays writable; needs autocommit
+    with op.get_context().autocommit_block():
+        op.create_index('ix_results_source_time', 'results', ['source_id', 'time_stamp', 'id'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_results_time', 'results', ['time_stamp', 'id'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_results_contents', 'results', ['contents'],
+                        unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_results_contents', table_name='results', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_results_time', table_name='results', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_results_source_time', table_name='results', postgresql_concurrently=True, if_exists=True)
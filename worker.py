@@ -0,0 +1,38 @@
+import argparse
+import signal
+
+from prometheus_client import start_http_server
+
+from app import create_app
+from app.config import Config
+from app.services import llm_client
+from app.services.crawler import stop_event
+from app.services.queue_worker import QueueWorker
+
+app = create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl tasks of distributed jobs from the shared Postgres queue")
+    parser.add_argument("--worker-id", help="name shown in crawl_tasks.leased_by (default: host-pid-random)")
+    parser.add_argument("--concurrency", type=int, help="tasks processed at once (default: WORKER_CONCURRENCY)")
+    args = parser.parse_args()
+
+    try:
+        llm_client.require_keys()
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    # Finish the tasks in hand, hand back the rest and exit
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop_event.set())
+
+    # Workers are separate processes, so each exposes its own metrics for Prometheus to scrape
+    if Config.WORKER_METRICS_PORT:
+        start_http_server(Config.WORKER_METRICS_PORT)
+
+    QueueWorker(app, None, worker_id=args.worker_id, concurrency=args.concurrency).run_sync()
+
+
+if __name__ == "__main__":
+    main()